@@ -0,0 +1,167 @@
+"""
+Benchmark pipeline analisis curah hujan dengan data sintetis.
+
+Generates a rainfall workbook with the same nine columns as
+'Data Jumlah curah hujan UPDATE.xlsx' at a configurable size, then times
+every stage of the pipeline (load, clean, each analysis of ANALYSES, the cube,
+Excel export and chart rendering) and reports throughput and peak memory.
+
+Contoh:
+    python benchmark.py --stations 200 --years 2015 2024
+    python benchmark.py --stations 50 --rows 500000 --no-charts --json bench.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import curah_hujan as ch
+from profiling import RunProfile
+
+
+def generate_rainfall_data(n_stations=4, year_start=2015, year_end=2024, rows=None,
+                           missing_fraction=0.01, seed=0):
+    """
+    Synthetic rainfall rows in the source workbook's nine-column layout.
+
+    Rows are laid out like the source (station, then year, then month). With
+    rows=None there is one row per station-month; a larger `rows` repeats the
+    grid (several readings per station-month), a smaller one truncates it.
+    A `missing_fraction` of the rainfall values is left empty.
+    """
+    rng = np.random.default_rng(seed)
+    years = np.arange(year_start, year_end + 1)
+    n_cells = n_stations * len(years) * 12
+    rows = n_cells if rows is None else rows
+
+    cell = np.arange(rows) % n_cells
+    station = cell // (len(years) * 12)
+    year = years[(cell // 12) % len(years)]
+    month = cell % 12
+
+    # Wet season Nov-Apr, dry season Jun-Sep
+    seasonal = 60 + 40 * np.cos((month - 0.5) * np.pi / 6)
+    rainfall = np.round(rng.gamma(2.0, seasonal / 2.0), 1)
+    rainfall[rng.random(rows) < missing_fraction] = np.nan
+
+    station_names = np.array([f'STASIUN {i:04d}' for i in range(n_stations)])
+    return pd.DataFrame({
+        'No': np.arange(1, rows + 1),
+        'Kode Provinsi': 32,
+        'Nama Provinsi': 'JAWA BARAT',
+        'Nama Pos Hujan': 'POS ' + pd.Series(station_names[station]).str[-4:],
+        'Nama Stasiun Hujan': station_names[station],
+        'Bulan': np.array(ch.month_order)[month],
+        'Jumlah Curah Hujan': rainfall,
+        'Satuan': 'MILIMETER',
+        'Tahun': year,
+    })
+
+
+def _stage_row(name, seconds, rows, peak_mb):
+    return {
+        'stage': name,
+        'seconds': round(seconds, 4),
+        'rows': rows,
+        'rows_per_second': round(rows / seconds) if seconds > 0 else None,
+        'peak_mb': round(peak_mb, 2),
+    }
+
+
+def measure(name, fn, rows, report):
+    """
+    Run fn once, append wall time, throughput and peak traced memory to
+    report. rows is the number of rows the stage processes, or a function
+    of fn's result returning it.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    report.append(_stage_row(name, elapsed, rows(result) if callable(rows) else rows, peak / 2**20))
+    return result
+
+
+def run_benchmark(n_stations, year_start, year_end, rows=None, charts=True, seed=0):
+    """Time every pipeline stage on a synthetic workbook. Returns the stage report."""
+    report = []
+    raw = generate_rainfall_data(n_stations, year_start, year_end, rows, seed=seed)
+    n = len(raw)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'synthetic.xlsx')
+        raw.to_excel(source, index=False)
+
+        loaded = measure('load (read_excel)', lambda: pd.read_excel(source), n, report)
+        df = measure('clean', lambda: ch.prepare_rainfall_frame(loaded), len(loaded), report)
+        df_filtered = ch.filter_years(df, year_start, year_end, columns=ch.ANALYSIS_COLUMNS)
+
+        # Every analysis of ch.ANALYSES, timed per stage by the run profile
+        profile = RunProfile(trace_memory=True)
+        results = ch.run_analyses(df, df_filtered, profile, year_start=year_start, year_end=year_end)
+        tracemalloc.stop()
+        for record in profile.stages:
+            report.append(_stage_row(record['stage'], record['wall_seconds'], record['rows'],
+                                     record['tracemalloc_peak_mb']))
+
+        import cube
+        rain_cube = measure('cube build', lambda: cube.RainfallCube.from_frame(df), len(df), report)
+        # The cube analyses read station x year x month cells, not rows
+        measure('cube analyses', lambda: cube.analyses_from_cube(rain_cube, year_start, year_end),
+                rain_cube.sum.size, report)
+
+        # Rows written to the workbooks, summed over the per-file profile stages
+        export_profile = RunProfile()
+        measure('excel export', lambda: ch.export_excel(results, tmp, only=ch.ANALYSES, profile=export_profile),
+                lambda _: sum(record['rows'] for record in export_profile.stages), report)
+
+        if charts:
+            os.environ['MPLBACKEND'] = 'Agg'
+            import diagram
+            jobs = diagram.chart_jobs(results, ch.month_order, f"{year_start}-{year_end}", only=ch.ANALYSES,
+                                      output_dir=tmp)
+            # Rows of the plotted result tables
+            measure('chart render', lambda: diagram.render_charts(jobs, parallel=False),
+                    lambda records: sum(record['rows'] for record in records), report)
+    return report
+
+
+def print_report(report):
+    print(f"{'Stage':<20} {'Seconds':>10} {'Rows/s':>14} {'Peak MB':>10}")
+    print("-" * 58)
+    for row in report:
+        throughput = f"{row['rows_per_second']:,}" if row['rows_per_second'] else '-'
+        print(f"{row['stage']:<20} {row['seconds']:>10.3f} {throughput:>14} {row['peak_mb']:>10.1f}")
+    print("-" * 58)
+    print(f"{'TOTAL':<20} {sum(row['seconds'] for row in report):>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stations', type=int, default=4, help='number of stations (default 4)')
+    parser.add_argument('--years', type=int, nargs=2, default=[2015, 2024], metavar=('START', 'END'),
+                        help='year range, inclusive (default 2015 2024)')
+    parser.add_argument('--rows', type=int, default=None,
+                        help='total rows (default: one per station-month)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-charts', action='store_true', help='skip the chart rendering stage')
+    parser.add_argument('--json', metavar='PATH', help='also write the report as JSON')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.stations, args.years[0], args.years[1], args.rows,
+                           charts=not args.no_charts, seed=args.seed)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump({'parameters': vars(args), 'stages': report}, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
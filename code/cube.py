@@ -0,0 +1,239 @@
+"""
+Pre-aggregated rainfall cube indexed by station x year x month.
+
+All the analyses are roll-ups of the same per-(station, year, month)
+cells, so the cells are stored once as dense NumPy arrays:
+
+    sum      float64  total rainfall of the cell
+    count    int32    number of source rows in the cell
+    max      float32  largest single value in the cell (NaN if empty)
+    max_seq  int64    source position of the first row holding that max,
+                      used for first-occurrence tie-breaking (-1 if empty)
+
+The axes are the sorted station names, a contiguous range of years and the
+months in calendar order. Every report is then derived in
+O(stations x years x 12) instead of O(raw rows). The cube is persisted
+next to the workbook as .npz with the same fingerprint sidecar as the
+Feather cache, and rebuilt when the source changes.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from curah_hujan import (
+    ANALYSES,
+    ANNUAL_RULES,
+    ROLLING_YEARS,
+    SEASON_RULES,
+    analyze_average,
+    build_classification,
+    build_max_rainfall,
+    build_percentage,
+    build_rolling,
+    build_season_tables,
+    cache_is_valid,
+    file_fingerprint,
+    month_order,
+    to_mm,
+)
+from risk import build_risk
+
+# Aggregation keys of one cell
+KEYS = ['Nama Stasiun Hujan', 'Tahun', 'Bulan']
+
+
+def cells_from_frame(data, seq_start=0):
+    """
+    Aggregate a cleaned frame into cells indexed by KEYS with columns sum,
+    count, max and max_seq. Row positions are numbered from seq_start.
+    """
+    data = data[KEYS].assign(**{
+        'Jumlah Curah Hujan': data['Jumlah Curah Hujan'].astype('float64'),
+        'seq': np.arange(seq_start, seq_start + len(data)),
+    })
+    grouped = data.groupby(KEYS, sort=False, observed=True)['Jumlah Curah Hujan']
+    cells = grouped.agg(['sum', 'count', 'max'])
+    cells['max_seq'] = data.loc[grouped.idxmax().values, 'seq'].values
+    return cells
+
+
+class RainfallCube:
+    def __init__(self, stations, years, months, sum, count, max, max_seq):
+        self.stations = np.asarray(stations, dtype=str)
+        self.years = np.asarray(years, dtype='int16')
+        self.months = list(months)
+        self.sum = sum
+        self.count = count
+        self.max = max
+        self.max_seq = max_seq
+
+    @classmethod
+    def from_cells(cls, cells):
+        """Build a cube from a cell table (see cells_from_frame)."""
+        cells = cells.reset_index()
+        stations = np.unique(cells['Nama Stasiun Hujan'].astype(str))
+        years = np.arange(cells['Tahun'].min(), cells['Tahun'].max() + 1)
+        # 'Bulan' holds the month_order names once normalised (normalize_months)
+        months = month_order
+
+        s = np.searchsorted(stations, cells['Nama Stasiun Hujan'].astype(str))
+        y = cells['Tahun'].to_numpy(dtype='int64') - years[0]
+        m = pd.Categorical(cells['Bulan'].astype(str), categories=months).codes
+
+        shape = (len(stations), len(years), len(months))
+        cube = cls(stations, years, months,
+                   np.zeros(shape, dtype='float64'),
+                   np.zeros(shape, dtype='int32'),
+                   np.full(shape, np.nan, dtype='float32'),
+                   np.full(shape, -1, dtype='int64'))
+        cube.sum[s, y, m] = cells['sum'].to_numpy()
+        cube.count[s, y, m] = cells['count'].to_numpy()
+        cube.max[s, y, m] = cells['max'].to_numpy()
+        cube.max_seq[s, y, m] = cells['max_seq'].to_numpy()
+        return cube
+
+    @classmethod
+    def from_frame(cls, data):
+        """Build a cube from a cleaned rainfall frame (curah_hujan.load_rainfall_data)."""
+        return cls.from_cells(cells_from_frame(data))
+
+    def select_stations(self, names):
+        """Cube restricted to the named stations (case-insensitive)."""
+        keep = np.isin(np.char.upper(self.stations), [name.upper() for name in names])
+        if not keep.any():
+            raise ValueError(f"None of the stations {sorted(names)} found in the data")
+        return RainfallCube(self.stations[keep], self.years, self.months,
+                            self.sum[keep], self.count[keep], self.max[keep], self.max_seq[keep])
+
+    def save(self, path):
+        np.savez_compressed(path, stations=self.stations, years=self.years,
+                            months=np.asarray(self.months, dtype=str),
+                            sum=self.sum, count=self.count, max=self.max, max_seq=self.max_seq)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(arrays['stations'], arrays['years'], arrays['months'].tolist(),
+                       arrays['sum'], arrays['count'], arrays['max'], arrays['max_seq'])
+
+
+# Bump when the cube layout or the cleaning it is built from changes
+CUBE_SCHEMA = 2
+
+
+def cube_paths(path):
+    """Return the (data, metadata) cube file paths for a source workbook."""
+    base = os.path.splitext(path)[0]
+    return base + '.cube.npz', base + '.cube.json'
+
+
+def load_or_build_cube(path, data):
+    """
+    Load the persisted cube of a source workbook if the source is unchanged,
+    otherwise build it from `data` (the cleaned frame) and save it.
+    """
+    cube_path, meta_path = cube_paths(path)
+    if os.path.exists(cube_path) and cache_is_valid(path, meta_path, CUBE_SCHEMA):
+        try:
+            return RainfallCube.load(cube_path)
+        except Exception as e:
+            print(f"Ignoring unreadable cube {cube_path}: {e}")
+
+    cube = RainfallCube.from_frame(data)
+    try:
+        cube.save(cube_path)
+        with open(meta_path, 'w') as fh:
+            json.dump(dict(file_fingerprint(path), schema=CUBE_SCHEMA), fh)
+    except Exception as e:
+        print(f"Could not write cube {cube_path}: {e}")
+    return cube
+
+
+def _first_argmax(max_values, max_seq, count):
+    """
+    Index along the last axis of the largest max; among equal maxima the
+    one whose row came first in the source.
+    """
+    filled = count > 0
+    best = np.where(filled, max_values, -np.inf).max(axis=-1, keepdims=True)
+    candidates = np.where(filled & (max_values == best), max_seq, np.iinfo(np.int64).max)
+    return candidates.argmin(axis=-1)
+
+
+def analyses_from_cube(cube, year_start, year_end, annual_rules=ANNUAL_RULES, season_rules=SEASON_RULES,
+                       rolling_years=ROLLING_YEARS, only=None):
+    """
+    Derive the analyses, or only those named in `only`, from the cube.
+    Returns the same keys as curah_hujan.run_analyses except 'data', plus
+    'years': the first and last year with data.
+    """
+    only = ANALYSES if only is None else only
+    months = np.asarray(cube.months)
+    in_period = (cube.years >= year_start) & (cube.years <= year_end)
+    years = cube.years[in_period]
+    p_sum = cube.sum[:, in_period]
+    p_count = cube.count[:, in_period]
+    n_stations, n_years, n_months = cube.max.shape
+    has_data = cube.count.sum(axis=(1, 2)) > 0
+    data_years = cube.years[cube.count.sum(axis=(0, 2)) > 0]
+    results = {'years': (int(data_years[0]), int(data_years[-1]))}
+
+    # Klasifikasi tahunan + bulan curah hujan tertinggi (the average is derived from it)
+    if 'classification' in only or 'average' in only:
+        month_idx = _first_argmax(cube.max[:, in_period], cube.max_seq[:, in_period], p_count)
+        si, yi = np.nonzero(p_count.sum(axis=2) > 0)
+        annual_summary = pd.DataFrame({
+            'Nama Stasiun Hujan': cube.stations[si],
+            'Tahun': years[yi],
+            'Total_Curah_Hujan': to_mm(p_sum.sum(axis=2)[si, yi]),
+            'Bulan_Max_Curah_Hujan': months[month_idx[si, yi]],
+        })
+        results['classification'] = build_classification(annual_summary, annual_rules)
+    if 'average' in only:
+        results['average'] = analyze_average(results['classification'])
+
+    # Curah hujan tertinggi setiap stasiun (semua tahun)
+    if 'max_rainfall' in only:
+        flat = _first_argmax(cube.max.reshape(n_stations, -1), cube.max_seq.reshape(n_stations, -1),
+                             cube.count.reshape(n_stations, -1))[has_data]
+        stations = np.nonzero(has_data)[0]
+        max_rows = pd.DataFrame({
+            'Nama Stasiun Hujan': cube.stations[stations],
+            'Jumlah Curah Hujan': cube.max.reshape(n_stations, -1)[stations, flat],
+            'Tahun': cube.years[flat // n_months],
+            'Bulan': months[flat % n_months],
+        })
+        results['max_rainfall'] = build_max_rainfall(max_rows)
+
+    # Persentase total per stasiun (semua tahun)
+    if 'percentage' in only:
+        station_totals = pd.Series(cube.sum.sum(axis=(1, 2))[has_data],
+                                   index=pd.Index(cube.stations[has_data], name='Nama Stasiun Hujan'))
+        results['percentage'] = build_percentage(station_totals)
+
+    # Rata-rata bulanan = total / jumlah data
+    if 'season' in only:
+        month_sum, month_count = p_sum.sum(axis=(0, 1)), p_count.sum(axis=(0, 1))
+        mi = np.nonzero(month_count > 0)[0]
+        monthly_mean = pd.Series(month_sum[mi] / month_count[mi], index=pd.Index(months[mi], name='Bulan'))
+        sm_sum, sm_count = p_sum.sum(axis=1), p_count.sum(axis=1)
+        si, mi = np.nonzero(sm_count > 0)
+        station_monthly_mean = pd.Series(
+            sm_sum[si, mi] / sm_count[si, mi],
+            index=pd.MultiIndex.from_arrays([cube.stations[si], months[mi]], names=['Nama Stasiun Hujan', 'Bulan']),
+        )
+        results['monthly_avg'], results['station_monthly_avg'] = build_season_tables(
+            monthly_mean, station_monthly_mean, season_rules)
+
+    # Rata-rata bergerak tahunan: the year axis is already contiguous
+    if 'rolling' in only:
+        results['rolling'] = build_rolling(cube.stations, cube.years, cube.sum.sum(axis=2), cube.count.sum(axis=2),
+                                           year_start, year_end, rolling_years)
+
+    # Klasifikasi risiko: every year of the cube forms the climatology
+    if 'risk' in only:
+        results['risk'] = build_risk(cube.stations, cube.years, cube.sum, cube.count,
+                                     year_start, year_end, annual_rules, season_rules)
+    return results
@@ -0,0 +1,1319 @@
+"""
+Analisis curah hujan per stasiun.
+
+The analyses form a pipeline of functions that pass DataFrames in memory:
+
+    load_rainfall_data_cached -> filter_years -> run_analyses -> sinks
+
+Sinks are the console report, the charts (diagram.py), the Excel
+workbooks and a JSON summary; the summary statistics they share are
+computed once per run (build_report). Excel export is optional and can
+run in a background thread while the charts are being drawn.
+
+Command line (the settings below are the defaults):
+
+    python curah_hujan.py --input data.xlsx --output-dir hasil --years 2020 2024
+    python curah_hujan.py --analyses percentage season --sinks console
+    python curah_hujan.py --analyses rolling --rolling-years 5 --sinks xlsx
+    python curah_hujan.py --stations KURIPAN "GUNUNG MAS" --sinks xlsx png --headless
+    python curah_hujan.py --headless --chart-formats png svg --dpi 150 --thumbnail 480
+    python curah_hujan.py --input "data/provinsi_*.xlsx" --sinks xlsx console
+    python curah_hujan.py --provinces "JAWA BARAT" --analyses classification season
+
+matplotlib is only imported when the png sink runs and openpyxl only when
+a workbook is read or written, so a console-only run on a cached source
+imports neither.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from profiling import RunProfile
+
+# Define the path to the uploaded Excel file
+file_path = 'Data Jumlah curah hujan UPDATE.xlsx'
+
+# Period used by the classification, average and seasonal analyses
+YEAR_START = 2020
+YEAR_END = 2024
+
+# Window of the rolling multi-year annual averages (rolling analysis)
+ROLLING_YEARS = 3
+
+# Excel sink settings
+EXPORT_EXCEL = True
+EXPORT_IN_BACKGROUND = True
+
+# Stream the source in row chunks instead of loading it whole (streaming.py).
+# Use for inputs larger than memory; the raw 'Data Lengkap' sheet is not written.
+STREAMING = False
+
+# Read the source through the partitioned Parquet store (store.py), so a
+# run reads only the province / year slice it needs. Implied by --provinces.
+USE_STORE = False
+
+# Derive the reports from the persisted station x year x month cube
+# (cube.py) instead of regrouping the raw rows
+USE_CUBE = True
+
+# Keep per-(station, year, month) aggregates between runs and process only
+# rows appended since the last run (incremental.py). Only result tables
+# whose results changed (or whose files are missing) are rewritten.
+INCREMENTAL = False
+
+# Render charts without a display: Agg backend, no plt.show(), one worker
+# process per figure (diagram.render_charts)
+HEADLESS = False
+
+# Chart files (diagram.OUTPUT): resolution, formats (png, svg, pdf) and
+# thumbnail width in pixels (None for none). Headless runs skip charts whose
+# data and options are unchanged since the run recorded in CHART_MANIFEST
+# (in the output directory; None to always redraw).
+CHART_DPI = 300
+CHART_FORMATS = ['png']
+CHART_THUMBNAIL = None
+CHART_MANIFEST = '.chart_manifest.json'
+
+# Run profile (profiling.py): wall/CPU time, memory and row count of every
+# stage, written as JSON next to the outputs. PROFILE_STAGE names one stage
+# to run under cProfile (e.g. 'load' or 'xlsx:klasifikasi_curah_hujan.xlsx').
+# Memory is the process peak RSS; PROFILE_TRACE_MEMORY adds tracemalloc
+# peaks per stage, which slows allocation-heavy stages several times over.
+PROFILE_JSON = 'run_profile.json'   # None to disable
+PROFILE_TRACE_MEMORY = False
+PROFILE_STAGE = None
+
+# Summary statistics of the console report as JSON (json sink)
+REPORT_JSON = 'ringkasan_curah_hujan.json'
+
+# On-disk memo of analysis results keyed by input fingerprint and parameters
+# (memo.py), so a rerun with one changed threshold recomputes only the
+# analyses that depend on it. Least recently used entries are evicted
+# beyond RESULT_MEMO_MAX_MB.
+RESULT_MEMO_DIR = '.result_memo'   # None to disable
+RESULT_MEMO_MAX_MB = 256
+
+# Column names used by every analysis below
+COLUMNS = ['No', 'Kode Provinsi', 'Nama Provinsi', 'Nama Pos Hujan', 'Nama Stasiun Hujan', 'Bulan', 'Jumlah Curah Hujan', 'Satuan', 'Tahun']
+
+# In-memory type of every column (compact_rainfall_frame). Text columns are
+# categoricals; 'integer' means the smallest integer type that fits and
+# 'month' an ordered categorical of the month_order names (normalize_months).
+SCHEMA = {
+    'No': 'integer',
+    'Kode Provinsi': 'category',
+    'Nama Provinsi': 'category',
+    'Nama Pos Hujan': 'category',
+    'Nama Stasiun Hujan': 'category',
+    'Bulan': 'month',
+    'Jumlah Curah Hujan': 'float32',
+    'Satuan': 'category',
+    'Tahun': 'int16',
+}
+
+# Columns the analyses read; the other columns are only written back to
+# the raw 'Data Lengkap' sheet
+ANALYSIS_COLUMNS = ['Nama Stasiun Hujan', 'Bulan', 'Jumlah Curah Hujan', 'Tahun']
+
+# Month order (matching the data format)
+month_order = ['JANUARI', 'FEBRUARI', 'MARET', 'APRIL', 'MEI', 'JUNI',
+               'JULI', 'AGUSTUS', 'SEPTEMBER', 'OKTOBER', 'NOVEMBER', 'DESEMBER']
+
+# Other spellings of each month found in upstream files (abbreviations,
+# older Indonesian spellings, English names). Matched case-insensitively;
+# the month number itself (1-12, optionally zero-padded) is accepted too.
+MONTH_ALIASES = [
+    ['JAN', 'JANUARY'],
+    ['FEB', 'PEB', 'PEBRUARI', 'FEBRUARY'],
+    ['MAR', 'MARCH'],
+    ['APR'],
+    ['MAY'],
+    ['JUN', 'JUNE'],
+    ['JUL', 'JULY'],
+    ['AGU', 'AGS', 'AGT', 'AGST', 'AUG', 'AUGUST'],
+    ['SEP', 'SEPT'],
+    ['OKT', 'OCT', 'OCTOBER'],
+    ['NOV', 'NOP', 'NOPEMBER'],
+    ['DES', 'DEC', 'DECEMBER'],
+]
+
+
+# --- 1. Load and Prepare Data ---
+def _header_key(name):
+    return ''.join(str(name).split()).upper()
+
+
+def check_header(header):
+    """
+    Raise ValueError unless header names the COLUMNS in the same order
+    (case and whitespace aside).
+    """
+    header = list(header)
+    if len(header) != len(COLUMNS):
+        raise ValueError(f"Expected the {len(COLUMNS)} rainfall columns {COLUMNS}, "
+                         f"found {len(header)}: {header}")
+    mismatched = [(found, expected) for found, expected in zip(header, COLUMNS)
+                  if _header_key(found) != _header_key(expected)]
+    if mismatched:
+        raise ValueError("Unexpected rainfall columns: "
+                         + ', '.join(f"{str(found)!r} where {expected!r} was expected" for found, expected in mismatched))
+
+
+def clean_rainfall_frame(data):
+    """Rename columns, coerce rainfall to float32 and drop rows without rainfall or month."""
+    check_header(data.columns)
+
+    # Rename columns to the canonical spelling for easier access
+    data.columns = COLUMNS
+
+    # Convert 'Jumlah Curah Hujan' to numeric, coercing errors to NaN
+    data['Jumlah Curah Hujan'] = pd.to_numeric(data['Jumlah Curah Hujan'], errors='coerce').astype('float32')
+
+    # Drop rows with missing rainfall data, and rows without a month (the
+    # monthly groupbys of the original analyses left those out too)
+    return data.dropna(subset=['Jumlah Curah Hujan', 'Bulan']).reset_index(drop=True)
+
+
+def prepare_rainfall_frame(data):
+    """
+    Clean a raw nine-column frame and type it for the analyses:
+    - columns renamed to COLUMNS
+    - 'Jumlah Curah Hujan' coerced to numeric (float32), missing rows dropped
+    - compacted to SCHEMA, constant columns dropped (compact_rainfall_frame)
+    """
+    raw_bytes = data.memory_usage(deep=True).sum()
+    return compact_rainfall_frame(clean_rainfall_frame(data), raw_bytes=raw_bytes)
+
+
+def compact_rainfall_frame(data, drop_constants=True, raw_bytes=None):
+    """
+    Convert a cleaned frame to SCHEMA and drop the columns outside
+    ANALYSIS_COLUMNS that hold a single value. The dropped values are kept
+    in data.attrs['constants'] (see restore_constants) and the memory before
+    and after in data.attrs['memory'].
+    """
+    if raw_bytes is None:
+        raw_bytes = data.memory_usage(deep=True).sum()
+    for col, kind in SCHEMA.items():
+        if col not in data.columns:
+            continue
+        if kind == 'integer':
+            data[col] = pd.to_numeric(data[col], downcast='integer')
+        elif kind == 'month':
+            data[col] = normalize_months(data[col])
+        else:
+            data[col] = data[col].astype(kind)
+
+    constants = dict(data.attrs.get('constants', {}))
+    if drop_constants and len(data):
+        for col in data.columns:
+            if col not in ANALYSIS_COLUMNS and data[col].nunique(dropna=False) == 1:
+                value = data[col].iloc[0]
+                # Plain Python values so the attrs survive the Feather cache
+                constants[col] = value.item() if isinstance(value, np.generic) else value
+        data = data.drop(columns=[col for col in constants if col in data.columns])
+
+    data.attrs['constants'] = constants
+    data.attrs['memory'] = {
+        'raw_mb': round(raw_bytes / 2**20, 3),
+        'compact_mb': round(data.memory_usage(deep=True).sum() / 2**20, 3),
+    }
+    return data
+
+
+def restore_constants(data):
+    """The frame with the dropped constant columns put back, in source column order."""
+    constants = data.attrs.get('constants', {})
+    missing = {col: value for col, value in constants.items() if col not in data.columns}
+    if not missing:
+        return data
+    data = data.assign(**missing)
+    return data[[col for col in COLUMNS if col in data.columns]]
+
+
+def memory_summary(data):
+    """One line on the memory saved by compact_rainfall_frame."""
+    memory = data.attrs.get('memory')
+    if not memory:
+        return None
+    saved = 1 - memory['compact_mb'] / memory['raw_mb'] if memory['raw_mb'] else 0
+    dropped = ', '.join(data.attrs.get('constants', {})) or '-'
+    return (f"Memory: {memory['raw_mb']:.3f} MB as read -> {memory['compact_mb']:.3f} MB compact "
+            f"({saved:.0%} saved; constant columns dropped: {dropped})")
+
+
+def is_multi_source(path):
+    """True if path names a directory or a glob pattern rather than one file (loaded by ingest.py)."""
+    return os.path.isdir(path) or glob.has_magic(path)
+
+
+def load_rainfall_data(path):
+    """Read the rainfall workbook (or a CSV export of it) once and return a cleaned, typed frame."""
+    if path.lower().endswith('.csv'):
+        return prepare_rainfall_frame(pd.read_csv(path))
+    # Read the Excel file. Assuming the data is in the first sheet.
+    return prepare_rainfall_frame(pd.read_excel(path))
+
+
+def to_mm(values):
+    """Convert float32 rainfall aggregates back to clean float64 millimetres for output."""
+    return values.astype('float64').round(2)
+
+
+# --- Monthly periods ---
+# 'Bulan' is normalised to the month_order names when the frame is loaded,
+# so every analysis sees one spelling per month in calendar order. Tahun +
+# Bulan then map to a monthly PeriodIndex, whose integer ordinals are
+# consecutive across year ends (used for the rolling multi-year windows).
+_MONTH_NUMBERS = {
+    spelling: number
+    for number, (name, aliases) in enumerate(zip(month_order, MONTH_ALIASES), start=1)
+    for spelling in [name, str(number), f'{number:02d}'] + aliases
+}
+
+
+def month_numbers(values):
+    """
+    Month number (1-12) of every value of a 'Bulan' column. Case, surrounding
+    blanks and a trailing dot are ignored; unknown spellings and missing
+    values raise ValueError (clean_rainfall_frame drops rows without a month).
+    """
+    # Look up each distinct spelling once, then broadcast through the codes
+    codes, spellings = pd.factorize(pd.Series(values).astype(str), sort=False)
+    if (codes == -1).any():
+        raise ValueError(f"Missing month in 'Bulan' at {int((codes == -1).sum())} row(s)")
+    keys = pd.Index(spellings).str.strip().str.rstrip('.').str.upper()
+    numbers = keys.map(_MONTH_NUMBERS)
+    unknown = sorted(set(spellings[numbers.isna()]))
+    if unknown:
+        raise ValueError(f"Unknown month names in 'Bulan': {unknown}")
+    return numbers.to_numpy(dtype='int8')[codes]
+
+
+def normalize_months(values):
+    """'Bulan' as an ordered categorical of the month_order names."""
+    return pd.Categorical.from_codes(month_numbers(values) - 1, categories=month_order, ordered=True)
+
+
+def monthly_periods(data):
+    """Monthly PeriodIndex of every row, from 'Tahun' and 'Bulan'."""
+    return pd.PeriodIndex.from_fields(year=data['Tahun'].to_numpy(dtype='int64'),
+                                      month=month_numbers(data['Bulan']), freq='M')
+
+
+def monthly_matrix(data):
+    """
+    Monthly rainfall series of every station as dense arrays.
+
+    Returns (stations, periods, sum, count): the sorted station names, a
+    monthly PeriodIndex spanning whole calendar years from the first to the
+    last year in the data, and the rainfall total and row count of each
+    station and period (arrays of shape stations x periods).
+    """
+    periods = monthly_periods(data)
+    first = pd.Period(year=int(periods.year.min()), month=1, freq='M')
+    last = pd.Period(year=int(periods.year.max()), month=12, freq='M')
+    span = pd.period_range(first, last, freq='M')
+
+    station_idx, stations = pd.factorize(data['Nama Stasiun Hujan'].astype(str), sort=True)
+    cell = station_idx * len(span) + (periods.asi8 - first.ordinal)
+    size = len(stations) * len(span)
+    rainfall = data['Jumlah Curah Hujan'].to_numpy(dtype='float64')
+    total = np.bincount(cell, weights=rainfall, minlength=size).reshape(len(stations), len(span))
+    count = np.bincount(cell, minlength=size).reshape(len(stations), len(span))
+    return np.asarray(stations), span, total, count
+
+
+# --- Columnar cache of the cleaned frame ---
+# The parsed workbook is kept next to the source as an Arrow/Feather file
+# (memory-mapped on read) plus a small JSON sidecar holding the source
+# file's size, mtime and SHA-256. The cache is reused while the source is
+# unchanged and rebuilt automatically when it changes.
+def file_fingerprint(path, with_hash=True):
+    """Return size, mtime and (optionally) SHA-256 of a file."""
+    stat = os.stat(path)
+    info = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as fh:
+            for block in iter(lambda: fh.read(1 << 20), b''):
+                digest.update(block)
+        info['sha256'] = digest.hexdigest()
+    return info
+
+
+# Bump when prepare_rainfall_frame changes the cached columns or types
+CACHE_SCHEMA = 3
+
+
+def cache_paths(path):
+    """Return the (data, metadata) cache file paths for a source workbook."""
+    base = os.path.splitext(path)[0]
+    return base + '.cache.feather', base + '.cache.json'
+
+
+def cache_is_valid(path, meta_path, schema=None):
+    """
+    Check the sidecar against the source workbook (and, if given, the
+    schema version the cached data was written with):
+    - same size and mtime -> valid without hashing
+    - same size, different mtime -> valid only if the SHA-256 still matches
+    """
+    try:
+        with open(meta_path) as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return False
+    if schema is not None and meta.get('schema') != schema:
+        return False
+    current = file_fingerprint(path, with_hash=False)
+    if meta.get('size') != current['size']:
+        return False
+    if meta.get('mtime_ns') == current['mtime_ns']:
+        return True
+    if meta.get('sha256') != file_fingerprint(path)['sha256']:
+        return False
+    # Content unchanged (e.g. file touched or copied): refresh the stored mtime
+    meta['mtime_ns'] = current['mtime_ns']
+    with open(meta_path, 'w') as fh:
+        json.dump(meta, fh)
+    return True
+
+
+def load_rainfall_data_cached(path):
+    """
+    Same result as load_rainfall_data(path), served from the columnar cache
+    when the source workbook is unchanged. Falls back to reading the
+    workbook directly if pyarrow is not installed or the cache is unusable.
+    """
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return load_rainfall_data(path)
+
+    data_path, meta_path = cache_paths(path)
+    if os.path.exists(data_path) and cache_is_valid(path, meta_path, CACHE_SCHEMA):
+        try:
+            return feather.read_table(data_path, memory_map=True).to_pandas()
+        except Exception as e:
+            print(f"Ignoring unreadable cache {data_path}: {e}")
+
+    data = load_rainfall_data(path)
+    try:
+        # Uncompressed so the file can be memory-mapped without decoding
+        feather.write_feather(data, data_path, compression='uncompressed')
+        with open(meta_path, 'w') as fh:
+            json.dump(dict(file_fingerprint(path), schema=CACHE_SCHEMA), fh)
+    except Exception as e:
+        print(f"Could not write cache {data_path}: {e}")
+    return data
+
+
+def filter_years(df, year_start=YEAR_START, year_end=YEAR_END, columns=None):
+    """
+    Filter data for the required years (inclusive). With `columns`, only
+    those columns are copied for the selected rows; if every row is in the
+    period no rows are copied at all.
+    """
+    data = df if columns is None else df[columns]
+    mask = (df['Tahun'] >= year_start) & (df['Tahun'] <= year_end)
+    if mask.all():
+        return data
+    return data[mask.to_numpy()]
+
+
+def filter_stations(df, stations):
+    """Keep the rows of the named stations (case-insensitive)."""
+    wanted = {name.upper() for name in stations}
+    names = df['Nama Stasiun Hujan'].astype(str).str.upper()
+    mask = names.isin(wanted)
+    if not mask.any():
+        raise ValueError(f"None of the stations {sorted(stations)} found in the data")
+    return df[mask]
+
+
+# --- 2. Calculate Annual Total Rainfall and Max Month per Station per Year ---
+
+# Find the row holding the maximum rainfall of each group in a single pass.
+# idxmax returns the first occurrence, so ties resolve to the earliest row
+# (the same month the old per-group boolean mask picked).
+def max_rainfall_rows(data, keys):
+    idx = data.groupby(keys, observed=True)['Jumlah Curah Hujan'].idxmax()
+    return data.loc[idx.values]
+
+
+# --- Vectorized classification ---
+# A classification is an ordered list of (label, operator, threshold) rules
+# checked top to bottom, plus a default label for values matching none of
+# them. The result is a Categorical; its categories are sorted by label so
+# grouped outputs (value_counts, unstack) keep the same column order they
+# had with plain string labels.
+_OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+}
+
+
+def classify_values(values, rules, default):
+    """Classify an array of rainfall values in one vectorized np.select call."""
+    arr = np.asarray(values, dtype='float64')
+    conditions = [_OPERATORS[op](arr, threshold) for _, op, threshold in rules]
+    labels = np.array([label for label, _, _ in rules] + [default])
+    categories = np.unique(labels)
+    # Map each rule position to the code of its label in the sorted categories
+    rule_codes = np.searchsorted(categories, labels)
+    codes = np.select(conditions, rule_codes[:-1], default=rule_codes[-1])
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+# Fungsi untuk mengklasifikasikan tingkat curah hujan
+# THRESHOLD YANG DIPERBAIKI:
+# Tinggi: > 700 mm/tahun
+# Sedang: 500-700 mm/tahun
+# Rendah: < 500 mm/tahun
+ANNUAL_RULES = [('Tinggi', '>', 700), ('Sedang', '>=', 500)]
+ANNUAL_DEFAULT = 'Rendah'
+
+
+def annual_rules(high, medium):
+    """ANNUAL_RULES with other thresholds: Tinggi > high, Sedang >= medium."""
+    return [('Tinggi', '>', high), ('Sedang', '>=', medium)]
+
+
+def classify_rainfall(total_rainfall, rules=ANNUAL_RULES, default=ANNUAL_DEFAULT):
+    return classify_values(total_rainfall, rules, default)
+
+
+def build_classification(annual_summary, rules=ANNUAL_RULES):
+    """
+    Classification table from per-station-year totals. annual_summary needs
+    'Nama Stasiun Hujan', 'Tahun', 'Total_Curah_Hujan' and 'Bulan_Max_Curah_Hujan'.
+    """
+    annual_summary = annual_summary.copy()
+    annual_summary['Klasifikasi_Curah_Hujan'] = classify_rainfall(annual_summary['Total_Curah_Hujan'], rules)
+
+    # Select and reorder columns for the first request
+    classification_result = annual_summary[['Nama Stasiun Hujan', 'Tahun', 'Klasifikasi_Curah_Hujan', 'Bulan_Max_Curah_Hujan', 'Total_Curah_Hujan']]
+    return classification_result.rename(columns={'Total_Curah_Hujan': 'Total Curah Hujan Tahunan (mm)'})
+
+
+def analyze_classification(df_filtered, rules=ANNUAL_RULES):
+    """Annual total, classification and month of maximum rainfall per station per year."""
+    # Group by Station and Year to get the annual total and the month with max rainfall
+    annual_summary = df_filtered.groupby(['Nama Stasiun Hujan', 'Tahun'], observed=True).agg(
+        Total_Curah_Hujan=('Jumlah Curah Hujan', 'sum'),
+        Max_Curah_Hujan=('Jumlah Curah Hujan', 'max')
+    ).reset_index()
+    annual_summary['Total_Curah_Hujan'] = to_mm(annual_summary['Total_Curah_Hujan'])
+    annual_summary['Max_Curah_Hujan'] = to_mm(annual_summary['Max_Curah_Hujan'])
+
+    # Month of maximum rainfall; both groupbys share the same sorted group order
+    max_rows = max_rainfall_rows(df_filtered, ['Nama Stasiun Hujan', 'Tahun'])
+    annual_summary['Bulan_Max_Curah_Hujan'] = max_rows['Bulan'].astype(str).values
+
+    return build_classification(annual_summary, rules)
+
+
+# --- 4. Calculate Average Annual Rainfall per Station ---
+def analyze_average(classification_result):
+    """Average annual rainfall per station over the filtered period."""
+    # Group the annual summary by station to calculate the average annual total
+    average_annual_rainfall = classification_result.groupby('Nama Stasiun Hujan', observed=True)['Total Curah Hujan Tahunan (mm)'].mean().reset_index(name='Rata-rata Curah Hujan Tahunan (mm)')
+
+    # Round the average to 2 decimal places
+    average_annual_rainfall['Rata-rata Curah Hujan Tahunan (mm)'] = average_annual_rainfall['Rata-rata Curah Hujan Tahunan (mm)'].round(2)
+    return average_annual_rainfall
+
+
+# --- Curah hujan tertinggi setiap stasiun (semua tahun) ---
+def build_max_rainfall(max_rows):
+    """Tabel curah hujan tertinggi dari satu baris maksimum per stasiun."""
+    # Membuat DataFrame dari informasi maksimum
+    df_max_info = pd.DataFrame({
+        'Stasiun': max_rows['Nama Stasiun Hujan'].astype(str).values,
+        'Curah Hujan Tertinggi': to_mm(max_rows['Jumlah Curah Hujan']).values,
+        'Tahun': max_rows['Tahun'].astype(int).values,
+        'Bulan': max_rows['Bulan'].astype(str).values
+    })
+
+    # Mengurutkan data berdasarkan curah hujan tertinggi
+    return df_max_info.sort_values('Curah Hujan Tertinggi', ascending=False)
+
+
+def analyze_max_rainfall(df):
+    """Curah hujan tertinggi per stasiun beserta tahun dan bulan kejadiannya."""
+    # Baris dengan curah hujan tertinggi untuk setiap stasiun (kemunculan pertama jika seri)
+    return build_max_rainfall(max_rainfall_rows(df, 'Nama Stasiun Hujan'))
+
+
+# --- Persentase total curah hujan per stasiun (semua tahun) ---
+def build_percentage(station_totals):
+    """
+    Total rainfall and percentage share per station.
+    Returns a frame indexed by station with 'Total Curah Hujan (mm)' and 'Persentase (%)'.
+    """
+    station_totals = to_mm(station_totals)
+
+    # Calculate percentages
+    total_rainfall = station_totals.sum()
+    percentages = (station_totals / total_rainfall * 100).round(2)
+    return pd.DataFrame({'Total Curah Hujan (mm)': station_totals, 'Persentase (%)': percentages})
+
+
+def analyze_percentage(df):
+    # Group by station and calculate total rainfall
+    return build_percentage(df.groupby('Nama Stasiun Hujan', observed=True)['Jumlah Curah Hujan'].sum())
+
+
+# --- Klasifikasi musim berdasarkan rata-rata curah hujan bulanan ---
+SEASON_RULES = [('Kemarau', '<', 50)]
+SEASON_DEFAULT = 'Hujan'
+
+
+def season_rules(threshold):
+    """SEASON_RULES with another threshold: Kemarau < threshold mm/month."""
+    return [('Kemarau', '<', threshold)]
+
+
+def classify_monthly_season(rainfall, rules=SEASON_RULES, default=SEASON_DEFAULT):
+    """
+    Classify monthly rainfall:
+    - Kemarau (Dry Season): Low rainfall (< 50mm/month)
+    - Hujan (Rainy Season): High rainfall (>= 50mm/month)
+    """
+    return classify_values(rainfall, rules, default)
+
+
+def build_season_tables(monthly_mean, station_monthly_mean, rules=SEASON_RULES):
+    """
+    Season tables from mean rainfall per month (Series indexed by 'Bulan')
+    and per station-month (Series indexed by 'Nama Stasiun Hujan', 'Bulan').
+    Returns (monthly_avg, station_monthly_avg).
+    """
+    monthly_avg = monthly_mean.reset_index(name='Rata-rata Curah Hujan (mm)')
+
+    # Round the average to 2 decimal places
+    monthly_avg['Rata-rata Curah Hujan (mm)'] = to_mm(monthly_avg['Rata-rata Curah Hujan (mm)'])
+
+    # Sort months in correct order
+    monthly_avg['Bulan'] = pd.Categorical(monthly_avg['Bulan'], categories=month_order, ordered=True)
+    monthly_avg = monthly_avg.sort_values('Bulan')
+
+    # Apply the classification
+    monthly_avg['Klasifikasi Musim'] = classify_monthly_season(monthly_avg['Rata-rata Curah Hujan (mm)'], rules)
+
+    station_monthly_avg = station_monthly_mean.reset_index(name='Rata-rata Curah Hujan (mm)')
+    station_monthly_avg['Rata-rata Curah Hujan (mm)'] = station_monthly_avg['Rata-rata Curah Hujan (mm)'].astype('float64')
+
+    # Apply classification to each station-month combination
+    station_monthly_avg['Klasifikasi Musim'] = classify_monthly_season(station_monthly_avg['Rata-rata Curah Hujan (mm)'], rules)
+
+    # Sort months in correct order for each station
+    station_monthly_avg['Bulan'] = pd.Categorical(station_monthly_avg['Bulan'], categories=month_order, ordered=True)
+    station_monthly_avg = station_monthly_avg.sort_values(['Nama Stasiun Hujan', 'Bulan'])
+    return monthly_avg, station_monthly_avg
+
+
+def analyze_monthly_season(df_filtered, rules=SEASON_RULES):
+    """Return (monthly_avg, station_monthly_avg) with Kemarau/Hujan classification."""
+    # Group by month to calculate average rainfall across all stations and years
+    monthly_mean = df_filtered.groupby('Bulan', observed=True)['Jumlah Curah Hujan'].mean()
+
+    # Group by station and month to get average rainfall
+    station_monthly_mean = df_filtered.groupby(['Nama Stasiun Hujan', 'Bulan'], observed=True)['Jumlah Curah Hujan'].mean()
+    return build_season_tables(monthly_mean, station_monthly_mean, rules)
+
+
+# --- Rata-rata bergerak curah hujan tahunan (multi-tahun) ---
+def build_rolling(stations, years, annual_sum, annual_count, year_start, year_end, window=ROLLING_YEARS):
+    """
+    Rolling `window`-year average of the annual totals of every station.
+
+    annual_sum and annual_count are (stations x years) arrays over the
+    contiguous `years`. Each reported year averages the years with data in
+    the window ending that year, so the window may reach back before
+    year_start. Only station-years with data inside the period are listed.
+    """
+    has_data = annual_count > 0
+    # Window sums as differences of cumulative sums along the year axis
+    cum_sum = np.pad(np.cumsum(np.where(has_data, annual_sum, 0.0), axis=1), ((0, 0), (1, 0)))
+    cum_years = np.pad(np.cumsum(has_data, axis=1), ((0, 0), (1, 0)))
+    end = np.arange(1, len(years) + 1)
+    start = np.maximum(end - window, 0)
+    window_sum = cum_sum[:, end] - cum_sum[:, start]
+    window_years = cum_years[:, end] - cum_years[:, start]
+
+    in_period = (years >= year_start) & (years <= year_end)
+    si, yi = np.nonzero(has_data & in_period)
+    return pd.DataFrame({
+        'Nama Stasiun Hujan': stations[si],
+        'Tahun': years[yi],
+        'Total Curah Hujan Tahunan (mm)': to_mm(annual_sum[si, yi]),
+        f'Rata-rata Bergerak {window} Tahun (mm)': to_mm(window_sum[si, yi] / window_years[si, yi]),
+        'Jumlah Tahun dalam Jendela': window_years[si, yi],
+    })
+
+
+def analyze_rolling(df, year_start, year_end, window=ROLLING_YEARS):
+    """Rolling multi-year averages of the annual totals (all years are used as history)."""
+    stations, periods, monthly_sum, monthly_count = monthly_matrix(df)
+    # The periods span whole calendar years, so a year is 12 consecutive columns
+    shape = (len(stations), -1, 12)
+    years = np.unique(periods.year)
+    return build_rolling(stations, years, monthly_sum.reshape(shape).sum(axis=2),
+                         monthly_count.reshape(shape).sum(axis=2), year_start, year_end, window)
+
+
+def run_analyses(df, df_filtered, profile=None, only=None,
+                 annual_rules=ANNUAL_RULES, season_rules=SEASON_RULES,
+                 rolling_years=ROLLING_YEARS, year_start=YEAR_START, year_end=YEAR_END):
+    """
+    Run the analyses, or only those named in `only`, and return their
+    results keyed by name. year_start/year_end is the period df_filtered
+    was filtered to; the rolling analysis reads df for its history.
+    """
+    profile = profile or RunProfile(enabled=False)
+    only = ANALYSES if only is None else only
+    results = {'data': df}
+    # The average is derived from the classification table
+    if 'classification' in only or 'average' in only:
+        with profile.stage('classification', rows=len(df_filtered)):
+            results['classification'] = analyze_classification(df_filtered, annual_rules)
+    if 'average' in only:
+        with profile.stage('average', rows=len(results['classification'])):
+            results['average'] = analyze_average(results['classification'])
+    if 'max_rainfall' in only:
+        with profile.stage('max_rainfall', rows=len(df)):
+            results['max_rainfall'] = analyze_max_rainfall(df)
+    if 'percentage' in only:
+        with profile.stage('percentage', rows=len(df)):
+            results['percentage'] = analyze_percentage(df)
+    if 'season' in only:
+        with profile.stage('season', rows=len(df_filtered)):
+            results['monthly_avg'], results['station_monthly_avg'] = analyze_monthly_season(df_filtered, season_rules)
+    if 'rolling' in only:
+        with profile.stage('rolling', rows=len(df)):
+            results['rolling'] = analyze_rolling(df, year_start, year_end, rolling_years)
+    if 'risk' in only:
+        import risk
+
+        with profile.stage('risk', rows=len(df)):
+            results['risk'] = risk.analyze_risk(df, year_start, year_end, annual_rules, season_rules)
+    return results
+
+
+# --- Report statistics ---
+# Summary figures shared by the console report, the workbooks and the JSON
+# report. build_report computes them once per run into results['report'];
+# a sink run without it (e.g. export_excel from benchmark.py) computes the
+# section it needs itself.
+def percentage_statistics(share):
+    """Total rainfall of all stations and the station with the largest total."""
+    station_totals = share['Total Curah Hujan (mm)']
+    top_station = station_totals.idxmax()
+    return {
+        'total_mm': float(station_totals.sum()),
+        'top_station': str(top_station),
+        'top_mm': float(station_totals[top_station]),
+        'top_percent': float(share['Persentase (%)'][top_station]),
+    }
+
+
+def season_statistics(monthly_avg, station_monthly_avg):
+    """
+    Number of months and mean rainfall per season over the monthly averages
+    (summary_stats), and the number of months per season of every station
+    (station_dist).
+    """
+    seasons = [SEASON_RULES[0][0], SEASON_DEFAULT]
+    by_season = (monthly_avg.groupby(monthly_avg['Klasifikasi Musim'].astype(str))['Rata-rata Curah Hujan (mm)']
+                 .agg(['size', 'mean']).reindex(seasons))
+    summary_stats = pd.DataFrame({
+        'Kategori': seasons,
+        'Jumlah Bulan': by_season['size'].fillna(0).astype(int).to_numpy(),
+        'Rata-rata Curah Hujan (mm)': by_season['mean'].to_numpy(),
+    }).round(2)
+    station_dist = station_monthly_avg.groupby('Nama Stasiun Hujan', observed=True)['Klasifikasi Musim'].value_counts().unstack(fill_value=0)
+    return {'summary_stats': summary_stats, 'station_dist': station_dist}
+
+
+# Analysis -> report section built from its results
+REPORT_SECTIONS = {
+    'max_rainfall': lambda results: {'table': results['max_rainfall']},
+    'percentage': lambda results: percentage_statistics(results['percentage']),
+    'season': lambda results: season_statistics(results['monthly_avg'], results['station_monthly_avg']),
+}
+
+
+def build_report(results, only=None):
+    """Report sections of the analyses in `only` (default: all with a section)."""
+    return {name: build(results) for name, build in REPORT_SECTIONS.items() if only is None or name in only}
+
+
+def report_section(results, name):
+    """The section of results['report'], or a freshly computed one."""
+    report = results.get('report') or {}
+    return report[name] if name in report else REPORT_SECTIONS[name](results)
+
+
+def write_json_report(results, path, only=None, period=None):
+    """Write the report sections (tables as lists of records) to a JSON file."""
+    def plain(value):
+        if isinstance(value, pd.DataFrame):
+            # Keep a named index (e.g. the station of station_dist) as a column
+            frame = value.reset_index(drop=value.index.name is None)
+            return json.loads(frame.to_json(orient='records', force_ascii=False))
+        return round(value, 2) if isinstance(value, float) else value
+
+    payload = {'period': period}
+    for name in REPORT_SECTIONS:
+        if only is None or name in only:
+            payload[name] = {key: plain(value) for key, value in report_section(results, name).items()}
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(payload, fh, ensure_ascii=False, indent=1)
+    return path
+
+
+# --- Console report ---
+def format_rows(columns, sep=' '):
+    """
+    Lines of a fixed-width text table. columns is a list of (values, spec)
+    with a printf-style spec per column, e.g. '%-12s' or '%-15.1f'; each
+    column is formatted in one vectorized call.
+    """
+    lines = None
+    for values, spec in columns:
+        values = np.asarray(values, dtype=str if spec.endswith('s') else 'float64')
+        text = np.char.mod(spec, values)
+        lines = text if lines is None else np.char.add(np.char.add(lines, sep), text)
+    return [] if lines is None else lines.tolist()
+
+
+def print_max_rainfall_summary(df_max_info):
+    print("\nRingkasan Curah Hujan Tertinggi per Stasiun:")
+    print(df_max_info.to_string(index=False))
+
+
+def print_percentage_summary(share, stats=None, span=None):
+    stats = stats or percentage_statistics(share)
+
+    # Print the analysis results
+    lines = format_rows([(share.index.astype(str), '%-20s'),
+                         (share['Total Curah Hujan (mm)'], '%-15.1f'),
+                         (share['Persentase (%)'], '%-10.1f%%')])
+    print("ANALISIS DATA CURAH HUJAN PER STASIUN" + (f" ({span})" if span else ""))
+    print("=" * 50)
+    print(f"{'Stasiun':<20} {'Total (mm)':<15} {'Persentase':<10}")
+    print("-" * 50)
+    print("\n".join(lines))
+    print("-" * 50)
+    print(f"{'TOTAL':<20} {stats['total_mm']:<15.1f} {'100.0%':<10}")
+
+    # The station with highest rainfall
+    print(f"\nStasiun dengan curah hujan tertinggi: {stats['top_station']}")
+    print(f"Total curah hujan: {stats['top_mm']:.1f} mm ({stats['top_percent']:.1f}%)")
+
+
+def print_season_summary(monthly_avg, station_monthly_avg, period=f"{YEAR_START}-{YEAR_END}", threshold=50,
+                         stats=None):
+    stats = stats or season_statistics(monthly_avg, station_monthly_avg)
+    counts = dict(zip(stats['summary_stats']['Kategori'], stats['summary_stats']['Jumlah Bulan']))
+
+    lines = format_rows([(monthly_avg['Bulan'], '%-12s'),
+                         (monthly_avg['Klasifikasi Musim'], '%-15s'),
+                         (monthly_avg['Rata-rata Curah Hujan (mm)'], '%-15.1f')])
+    print("\n" + "="*70)
+    print(f"KLASIFIKASI MUSIM BERDASARKAN RATA-RATA CURAH HUJAN BULANAN ({period})")
+    print("="*70)
+    print(f"{'Bulan':<12} {'Klasifikasi Musim':<15} {'Rata-rata (mm)':<15}")
+    print("-"*70)
+    print("\n".join(lines))
+    print("-"*70)
+    print(f"\nJumlah Bulan Musim Kemarau: {counts['Kemarau']}")
+    print(f"Jumlah Bulan Musim Hujan: {counts['Hujan']}")
+    print("="*70)
+
+    print("\nKeterangan Klasifikasi:")
+    print(f"- Kemarau: < {threshold:g}mm/bulan")
+    print(f"- Hujan: >= {threshold:g}mm/bulan")
+
+    # Print station-specific summary
+    print("\n" + "="*70)
+    print(f"DISTRIBUSI MUSIM PER STASIUN ({period})")
+    print("="*70)
+    print(stats['station_dist'].to_string())
+    print("="*70)
+
+
+# --- Excel sink ---
+def build_percentage_table(share, stats=None):
+    """Ranked percentage table with a TOTAL row, as written to Excel."""
+    stats = stats or percentage_statistics(share)
+    # Create a summary DataFrame
+    summary_df = pd.DataFrame({
+        'Nama Stasiun': share.index,
+        'Total Curah Hujan (mm)': share['Total Curah Hujan (mm)'].values,
+        'Persentase (%)': share['Persentase (%)'].values
+    })
+
+    # Sort by total rainfall (descending)
+    summary_df = summary_df.sort_values('Total Curah Hujan (mm)', ascending=False)
+
+    # Add ranking
+    summary_df['Peringkat'] = range(1, len(summary_df) + 1)
+
+    # Reorder columns
+    summary_df = summary_df[['Peringkat', 'Nama Stasiun', 'Total Curah Hujan (mm)', 'Persentase (%)']]
+
+    # Add total row
+    total_row = pd.DataFrame({
+        'Peringkat': [''],
+        'Nama Stasiun': ['TOTAL'],
+        'Total Curah Hujan (mm)': [stats['total_mm']],
+        'Persentase (%)': [100.0]
+    })
+
+    return pd.concat([summary_df, total_row], ignore_index=True)
+
+
+def classification_sheets(results):
+    # Save the classification result to Excel
+    return [('Sheet1', results['classification'], {})]
+
+
+def average_sheets(results):
+    # Save the average annual rainfall result to Excel
+    return [('Sheet1', results['average'], {})]
+
+
+def max_rainfall_sheets(results):
+    # Menyimpan hasil ke file Excel
+    sheets = [('Curah Hujan Tertinggi', results['max_rainfall'], {})]
+
+    # Menambahkan sheet detail data untuk referensi (tidak tersedia pada mode streaming)
+    df = results.get('data')
+    if df is not None:
+        df = restore_constants(df)
+        sheets.append(('Data Lengkap', df.assign(**{'Jumlah Curah Hujan': to_mm(df['Jumlah Curah Hujan'])}), {}))
+    return sheets
+
+
+def percentage_sheets(results):
+    # Column widths: Peringkat, Nama Stasiun, Total Curah Hujan, Persentase
+    widths = {'A': 10, 'B': 20, 'C': 20, 'D': 15}
+    table = build_percentage_table(results['percentage'], report_section(results, 'percentage'))
+    return [('Persentase per Stasiun', table, widths)]
+
+
+def rolling_sheets(results):
+    return [('Rata-rata Bergerak', results['rolling'], {'A': 25, 'C': 30, 'D': 30, 'E': 25})]
+
+
+def risk_sheets(results):
+    risk_table = results['risk']
+    # Number of months per risk tier for each station
+    station_summary = risk_table.groupby('Nama Stasiun Hujan', observed=True)['Klasifikasi Risiko'].value_counts().unstack(fill_value=0)
+    return [
+        ('Risiko per Bulan', risk_table, {'A': 25}),
+        ('Ringkasan Risiko', station_summary.reset_index(), {'A': 25}),
+    ]
+
+
+def season_sheets(results):
+    monthly_avg = results['monthly_avg']
+    station_monthly_avg = results['station_monthly_avg']
+
+    # Summary statistics and monthly distribution by station
+    stats = report_section(results, 'season')
+    summary_stats, station_summary = stats['summary_stats'], stats['station_dist']
+
+    return [
+        # Sheet 1: Overall monthly averages
+        ('Rata-rata Bulanan', monthly_avg, {}),
+        # Sheet 2: Detailed station-month data
+        ('Data per Stasiun', station_monthly_avg, {}),
+        # Sheet 3: Summary statistics
+        ('Ringkasan Statistik', summary_stats, {}),
+        # Sheet 4: Monthly distribution by station
+        ('Distribusi per Stasiun', station_summary.reset_index(), {}),
+    ]
+
+
+# Analysis name -> (workbook file, sheets). The sheets are written by the
+# bulk writers in writers.py, as a workbook and/or CSV/Parquet files.
+EXCEL_OUTPUTS = {
+    'classification': ('klasifikasi_curah_hujan.xlsx', classification_sheets),
+    'average': ('rata_rata_curah_hujan.xlsx', average_sheets),
+    'max_rainfall': ('curah_hujan_tertinggi_per_stasiun.xlsx', max_rainfall_sheets),
+    'percentage': ('persentase_curah_hujan_per_stasiun.xlsx', percentage_sheets),
+    'season': ('klasifikasi_bulanan_curah_hujan.xlsx', season_sheets),
+    'rolling': ('rata_rata_bergerak_curah_hujan.xlsx', rolling_sheets),
+    'risk': ('klasifikasi_risiko_curah_hujan.xlsx', risk_sheets),
+}
+
+# The analyses, in report order
+ANALYSES = list(EXCEL_OUTPUTS)
+
+# Analyses that read every year in the data, not only the selected period
+# (risk uses all years as the climatology)
+ALL_YEARS_ANALYSES = ['max_rainfall', 'percentage', 'risk']
+
+
+def export_tables(results, output_dir='.', only=None, profile=None, in_thread=False, formats=('xlsx',)):
+    """
+    Write the result workbooks, or only those of the analyses named in
+    `only`, in each of `formats` ('xlsx', 'csv', 'parquet'). Returns the
+    written paths keyed by (analysis, format).
+    """
+    import writers
+
+    profile = profile or RunProfile(enabled=False)
+    written = {}
+    for name, (file_name, build_sheets) in EXCEL_OUTPUTS.items():
+        if only is not None and name not in only:
+            continue
+        path = os.path.join(output_dir, file_name)
+        sheets = build_sheets(results)
+        for fmt in formats:
+            with profile.stage(f'{fmt}:{file_name}', rows=sum(len(frame) for _, frame, _ in sheets),
+                               in_thread=in_thread):
+                written[name, fmt] = writers.write_table(path, sheets, fmt)
+    return written
+
+
+def export_excel(results, output_dir='.', only=None, profile=None, in_thread=False, formats=('xlsx',)):
+    """export_tables, returning the list of written paths."""
+    written = export_tables(results, output_dir, only, profile, in_thread, formats)
+    return [path for paths in written.values() for path in paths]
+
+
+def start_excel_export(results, output_dir='.', background=EXPORT_IN_BACKGROUND, only=None, profile=None,
+                       formats=('xlsx',)):
+    """
+    Run export_tables as the final sink. With background=True the workbooks
+    are written in a worker thread; call .result() on the returned future
+    to wait for it (errors are re-raised there).
+    """
+    if not background:
+        return _completed(export_tables, results, output_dir, only, profile, False, formats)
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(export_tables, results, output_dir, only, profile, True, formats)
+    executor.shutdown(wait=False)
+    return future
+
+
+def _completed(fn, *args):
+    """Run fn synchronously and wrap the outcome in a finished Future."""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+# --- Pipeline ---
+SINKS = ['xlsx', 'csv', 'parquet', 'png', 'console', 'json']
+TABLE_FORMATS = ['xlsx', 'csv', 'parquet']
+
+
+def analysis_options_parser():
+    """
+    Parent parser of the options that change the analysis results: period,
+    thresholds and rolling window. Shared by this CLI and service.py.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    group = parser.add_argument_group('analysis options')
+    group.add_argument('--years', type=int, nargs=2, default=[YEAR_START, YEAR_END], metavar=('START', 'END'),
+                       help=f'period of the classification, average and seasonal analyses (default {YEAR_START} {YEAR_END})')
+    group.add_argument('--annual-thresholds', type=float, nargs=2, metavar=('TINGGI', 'SEDANG'),
+                       default=[ANNUAL_RULES[0][2], ANNUAL_RULES[1][2]],
+                       help='annual classification: Tinggi > TINGGI mm, Sedang >= SEDANG mm (default 700 500)')
+    group.add_argument('--season-threshold', type=float, metavar='MM', default=SEASON_RULES[0][2],
+                       help='monthly average below which a month is Kemarau (default 50)')
+    group.add_argument('--rolling-years', type=int, metavar='N', default=ROLLING_YEARS,
+                       help=f'window of the rolling multi-year averages (default {ROLLING_YEARS})')
+    return parser
+
+
+def check_analysis_options(parser, args):
+    """Validate the analysis_options_parser options of parsed args (exits through parser.error)."""
+    if args.years[0] > args.years[1]:
+        parser.error('--years START must not be after END')
+    # Defaults are not passed through type=float; keep one type so memo keys match
+    args.annual_thresholds = [float(value) for value in args.annual_thresholds]
+    args.season_threshold = float(args.season_threshold)
+    if args.rolling_years < 1:
+        parser.error('--rolling-years must be at least 1')
+    if args.annual_thresholds[0] < args.annual_thresholds[1]:
+        parser.error('--annual-thresholds TINGGI must not be below SEDANG')
+
+
+def analysis_options(args):
+    """Rule and window keyword arguments of the analyses from the parsed options."""
+    return {'annual_rules': annual_rules(*args.annual_thresholds), 'season_rules': season_rules(args.season_threshold),
+            'rolling_years': args.rolling_years}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Analisis curah hujan per stasiun.',
+                                     parents=[analysis_options_parser()])
+    parser.add_argument('--input', default=file_path, metavar='PATH',
+                        help=f"source workbook or CSV, or a directory / glob pattern of them (default '{file_path}')")
+    parser.add_argument('--output-dir', default='.', metavar='DIR',
+                        help='directory for workbooks, charts and the run profile (default: current)')
+    parser.add_argument('--stations', nargs='+', metavar='NAME',
+                        help='only analyse these stations (default: all)')
+    parser.add_argument('--provinces', nargs='+', metavar='KODE_OR_NAME',
+                        help='only analyse these provinces, by code or name (reads the partitioned store)')
+    parser.add_argument('--analyses', nargs='+', choices=ANALYSES, default=ANALYSES,
+                        help='analyses to run (default: all)')
+    parser.add_argument('--sinks', nargs='+', choices=SINKS,
+                        default=['xlsx', 'png', 'console'] if EXPORT_EXCEL else ['png', 'console'],
+                        help='outputs to produce: workbooks, CSV/Parquet tables, charts, console report, '
+                             'JSON summary '
+                             '(default: xlsx png console)')
+
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--streaming', action='store_true', default=STREAMING,
+                      help='stream the source in chunks (bounded memory)')
+    mode.add_argument('--incremental', action='store_true', default=INCREMENTAL,
+                      help='fold only rows appended since the last run')
+    parser.add_argument('--store', dest='use_store', action='store_true', default=USE_STORE,
+                        help='read the source through the province/year partitioned Parquet store')
+    parser.add_argument('--no-cube', dest='use_cube', action='store_false', default=USE_CUBE,
+                        help='regroup the raw rows instead of using the station x year x month cube')
+    parser.add_argument('--memo-dir', default=RESULT_MEMO_DIR, metavar='DIR',
+                        help=f"directory of the result memo (default '{RESULT_MEMO_DIR}')")
+    parser.add_argument('--no-memo', dest='memo_dir', action='store_const', const=None,
+                        help='always recompute the analyses')
+    parser.add_argument('--headless', action='store_true', default=HEADLESS,
+                        help='render charts to files without a display')
+    parser.add_argument('--dpi', type=int, default=CHART_DPI,
+                        help=f'resolution of raster charts (default {CHART_DPI})')
+    parser.add_argument('--chart-formats', nargs='+', choices=['png', 'svg', 'pdf'], default=CHART_FORMATS,
+                        help='chart file formats (default png)')
+    parser.add_argument('--thumbnail', type=int, default=CHART_THUMBNAIL, metavar='PX',
+                        help='also write <chart>_thumb.png this many pixels wide')
+    parser.add_argument('--no-tight-bbox', dest='tight_bbox', action='store_false',
+                        help='save charts without cropping to the drawn content (one layout pass less)')
+    parser.add_argument('--redraw', action='store_true',
+                        help='redraw every chart even if its data is unchanged')
+    parser.add_argument('--profile', default=PROFILE_JSON, metavar='FILE',
+                        help=f"run profile JSON written to the output directory (default '{PROFILE_JSON}')")
+    parser.add_argument('--no-profile', dest='profile', action='store_const', const=None,
+                        help='do not write a run profile')
+    parser.add_argument('--trace-memory', action='store_true', default=PROFILE_TRACE_MEMORY,
+                        help='record tracemalloc peaks per stage (slows the timed stages)')
+    parser.add_argument('--profile-stage', default=PROFILE_STAGE, metavar='STAGE',
+                        help='run this stage under cProfile')
+
+    args = parser.parse_args(argv)
+    check_analysis_options(parser, args)
+    # Keep the report order whatever order the names were given in
+    args.analyses = [name for name in ANALYSES if name in args.analyses]
+    args.use_store = args.use_store or bool(args.provinces)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    source = args.input
+    year_start, year_end = args.years
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    profile = RunProfile(enabled=args.profile is not None, trace_memory=args.trace_memory,
+                         profile_stage=args.profile_stage, output_dir=args.output_dir)
+
+    # Analyses reported on the console and charted, and those whose result
+    # tables are written this run
+    requested = selected = args.analyses
+    high, medium = args.annual_thresholds
+    options = analysis_options(args)
+
+    # A directory or glob pattern is loaded file by file in parallel (ingest.py)
+    multi_source = is_multi_source(source)
+    if multi_source and (args.incremental or args.streaming or args.use_store):
+        print("Streaming, incremental and store runs need a single source file, not a directory or pattern.")
+        return
+    if args.use_store and (args.incremental or args.streaming):
+        print("The partitioned store cannot be combined with streaming or incremental runs.")
+        return
+
+    if args.incremental:
+        import incremental
+
+        try:
+            with profile.stage('load+analyses (incremental)') as record:
+                results, new_rows = incremental.run_incremental(
+                    source, year_start, year_end, stations=args.stations, only=requested, **options)
+                record['rows'] = new_rows
+            print(f"Data updated incrementally: {new_rows} new rows")
+        except Exception as e:
+            print(f"Error reading {source}: {e}")
+            return
+    elif args.streaming:
+        import streaming
+
+        try:
+            with profile.stage('load+analyses (streaming)') as record:
+                results, rows_read = streaming.run_streaming_analyses(
+                    source, year_start, year_end, stations=args.stations, only=requested, **options)
+                record['rows'] = rows_read
+            print(f"Data streamed successfully: {rows_read} rows")
+        except Exception as e:
+            print(f"Error reading {source}: {e}")
+            return
+    else:
+        try:
+            with profile.stage('load') as record:
+                if multi_source:
+                    import ingest
+
+                    full, report = ingest.load_sources(source)
+                    ingest.print_report(report)
+                    for item in report:
+                        profile.add({'stage': f"parse:{os.path.basename(item['file'])}", 'rows': item['rows'],
+                                     'wall_seconds': item['seconds'], 'error': item['error']})
+                elif args.use_store:
+                    import store
+
+                    # Years outside the period are only read for the all-years
+                    # analyses and for the history of the rolling windows
+                    first_year = last_year = None
+                    if not set(requested) & set(ALL_YEARS_ANALYSES):
+                        lookback = args.rolling_years - 1 if 'rolling' in requested else 0
+                        first_year, last_year = year_start - lookback, year_end
+                    full, scan = store.load_slice(source, args.provinces, first_year, last_year, args.stations)
+                    record['scan'] = scan
+                    print(f"Store: read {scan['files_read']} of {scan['files_total']} partition files")
+                else:
+                    full = load_rainfall_data_cached(source)
+                record['rows'] = len(full)
+                record['memory'] = full.attrs.get('memory')
+            print("Data loaded successfully!")
+            if memory_summary(full):
+                print(memory_summary(full))
+            df = filter_stations(full, args.stations) if args.stations else full
+        except Exception as e:
+            print(f"Error reading {source}: {e}")
+            return
+
+        df_filtered = filter_years(df, year_start, year_end, columns=ANALYSIS_COLUMNS)
+        print(f"Data filtered for years {year_start}-{year_end}: {len(df_filtered)} records")
+
+        def compute(names):
+            if not args.use_cube:
+                return run_analyses(df, df_filtered, profile, only=names, year_start=year_start,
+                                    year_end=year_end, **options)
+            import cube
+
+            with profile.stage('cube', rows=len(full)):
+                # The persisted cube covers every station; the filter is applied to it.
+                # Several source files have no single fingerprint and a store slice is not
+                # the whole source, so their cube is built in memory and not persisted.
+                if multi_source or args.use_store:
+                    rain_cube = cube.RainfallCube.from_frame(full)
+                else:
+                    rain_cube = cube.load_or_build_cube(source, full)
+                if args.stations:
+                    rain_cube = rain_cube.select_stations(args.stations)
+            with profile.stage('analyses (cube)', rows=int(rain_cube.count.sum())):
+                return cube.analyses_from_cube(rain_cube, year_start, year_end, only=names, **options)
+
+        if args.memo_dir:
+            import memo
+
+            cache = memo.ResultCache(args.memo_dir, RESULT_MEMO_MAX_MB * 2**20)
+            with profile.stage('memo fingerprint', rows=len(df)):
+                fingerprint = memo.frame_fingerprint(df)
+            params = {name: memo.analysis_params(name, year_start, year_end, **options) for name in requested}
+            results, missing = memo.memoized_analyses(cache, fingerprint, requested, params, compute)
+            print(f"Result memo: {len(requested) - len(missing)} of {len(requested)} analyses reused")
+        else:
+            results = compute(requested)
+        results['data'] = df
+        results['years'] = (int(df['Tahun'].min()), int(df['Tahun'].max()))
+    print("Analysis complete.")
+
+    # Summary statistics shared by the console, workbook and JSON sinks
+    with profile.stage('report'):
+        results['report'] = build_report(results, requested)
+
+    # Tables are the final sink: start them now so they overlap with chart rendering
+    export = None
+    formats = [fmt for fmt in TABLE_FORMATS if fmt in args.sinks]
+    if formats and args.incremental:
+        # Only the tables whose results changed or whose files are missing
+        selected = incremental.stale_outputs(results, requested, args.output_dir, formats)
+        if not selected:
+            print("No changes since the last run; result tables are up to date.")
+    if formats and selected:
+        export = start_excel_export(results, args.output_dir, only=selected, profile=profile, formats=formats)
+
+    period = f"{year_start}-{year_end}"
+    # Years in the data, the span of the all-years analyses
+    span = "{}-{}".format(*results['years'])
+    if args.headless:
+        # Set before matplotlib is imported; spawned workers inherit it
+        os.environ['MPLBACKEND'] = 'Agg'
+    if 'png' in args.sinks:
+        import diagram
+
+        output = {'dpi': args.dpi, 'formats': tuple(args.chart_formats), 'thumbnail': args.thumbnail,
+                  'tight': args.tight_bbox}
+        # Unchanged charts are skipped through the chart manifest
+        jobs = diagram.chart_jobs(results, month_order, period, only=requested, output_dir=args.output_dir,
+                                  annual_thresholds=(high, medium), season_threshold=args.season_threshold,
+                                  output=output, span=span)
+        manifest = None if args.redraw or not CHART_MANIFEST else os.path.join(args.output_dir, CHART_MANIFEST)
+        with profile.stage('charts'):
+            if args.headless:
+                records = diagram.render_charts(jobs, manifest_path=manifest)
+                for record in records:
+                    profile.add(record)
+                skipped = sum(bool(record.get('skipped')) for record in records)
+                if skipped:
+                    print(f"Charts: {skipped} of {len(records)} unchanged, not redrawn")
+            else:
+                diagram.show_charts(jobs)
+
+    if 'console' in args.sinks:
+        with profile.stage('console'):
+            if 'max_rainfall' in requested:
+                print_max_rainfall_summary(results['max_rainfall'])
+            if 'percentage' in requested:
+                print_percentage_summary(results['percentage'], results['report']['percentage'], span)
+            if 'season' in requested:
+                print_season_summary(results['monthly_avg'], results['station_monthly_avg'], period,
+                                     args.season_threshold, results['report']['season'])
+
+    if 'json' in args.sinks:
+        with profile.stage('json'):
+            path = write_json_report(results, os.path.join(args.output_dir, REPORT_JSON), requested, period)
+        print(f"Ringkasan disimpan sebagai: {path}")
+
+    if export is not None:
+        with profile.stage('tables (wait)'):
+            written = export.result()
+        if args.incremental:
+            incremental.record_outputs(results, written, args.output_dir)
+        for paths in written.values():
+            for path in paths:
+                print(f"Hasil analisis disimpan sebagai: {path}")
+
+    profile_path = profile.write_json(args.profile) if args.profile else None
+    if profile_path:
+        print(f"Run profile saved as: {profile_path}")
+
+
+if __name__ == '__main__':
+    main()
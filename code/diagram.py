@@ -0,0 +1,472 @@
+"""
+Diagram curah hujan.
+
+Each function draws one figure from an in-memory result frame produced by
+curah_hujan.run_analyses and saves it (see OUTPUT for resolution, formats
+and thumbnails). Bar labels are drawn with one bar_label call per bar group
+from precomputed label arrays; charts with more bars than fit on one figure
+are split into numbered pages.
+
+render_charts draws all figures headless (Agg backend, no plt.show()),
+each in its own worker process, from picklable (function, args, kwargs)
+jobs built by chart_jobs. Given a manifest path it hashes each job's data
+and options and skips charts whose hash matches the files already written.
+"""
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from parallel import process_map
+
+
+# Above these sizes a chart is split into several pages (numbered files
+# *_p1.png, *_p2.png, ...) so every figure stays readable and the cost per
+# bar stays constant
+CLASSIFICATION_BARS_PER_PAGE = 40
+STATION_BARS_PER_PAGE = 50
+STATIONS_PER_MONTHLY_PAGE = 6
+# The pie keeps the largest stations and merges the rest into one wedge
+PIE_MAX_WEDGES = 12
+
+# How figures are saved; override per call with output={...}:
+#   dpi        resolution of raster formats
+#   formats    one file per format, e.g. ('png', 'svg', 'pdf'); vector
+#              formats ignore dpi
+#   thumbnail  width in pixels of an extra <name>_thumb.png, None for none
+#   tight      crop to the drawn content (bbox_inches='tight'); costs an
+#              extra layout pass per file
+OUTPUT = {'dpi': 300, 'formats': ('png',), 'thumbnail': None, 'tight': True}
+
+# Bump when a plot function changes, so unchanged data is drawn again
+CHART_VERSION = 1
+
+
+def _finish(show):
+    """Show the current figure interactively, or just release it when headless."""
+    if show:
+        plt.show()
+    else:
+        plt.close()
+
+
+def _pages(n, per_page):
+    """Slices splitting n items into pages of at most per_page items."""
+    return [slice(start, start + per_page) for start in range(0, max(n, 1), per_page)]
+
+
+def _page_path(output_path, page, n_pages):
+    """output_path for a single page, output_path with a _p<page> suffix otherwise."""
+    if n_pages == 1:
+        return output_path
+    stem, ext = os.path.splitext(output_path)
+    return f'{stem}_p{page}{ext}'
+
+
+def _page_title(title, page, n_pages):
+    return title if n_pages == 1 else f'{title} - halaman {page}/{n_pages}'
+
+
+def _span_label(span):
+    """' (first-last)' title suffix of the years in the data, or '' if unknown."""
+    return f' ({span})' if span else ''
+
+
+def _save(path, output=None):
+    """Save the current figure as path in every output format. Returns the written paths."""
+    output = {**OUTPUT, **(output or {})}
+    stem = os.path.splitext(path)[0]
+    bbox = 'tight' if output['tight'] else None
+    written = []
+    for fmt in output['formats']:
+        written.append(f'{stem}.{fmt}')
+        plt.savefig(written[-1], dpi=output['dpi'], bbox_inches=bbox)
+    if output['thumbnail']:
+        # Resolution that makes the figure thumbnail pixels wide (before cropping)
+        written.append(f'{stem}_thumb.png')
+        plt.savefig(written[-1], dpi=output['thumbnail'] / plt.gcf().get_figwidth(), bbox_inches=bbox)
+    return written
+
+
+def _random_colors(n):
+    """One random RGB colour per bar."""
+    return [tuple(rgb) for rgb in np.random.random((n, 3))]
+
+
+# --- Create Bar Chart with Random Colors for Rainfall Classification ---
+def plot_classification(df_chart, output_path='diagram_batang_klasifikasi_curah_hujan_FIXED.png', show=True,
+                        thresholds=(700, 500), output=None):
+    # Create a combined label for station and year
+    station_year = (df_chart['Nama Stasiun Hujan'].astype(str) + ' (' + df_chart['Tahun'].astype(str) + ')').to_numpy()
+    rainfall = df_chart['Total Curah Hujan Tahunan (mm)'].to_numpy()
+
+    # Classification, rainfall and month shown at the end of each bar
+    bar_labels = (df_chart['Klasifikasi_Curah_Hujan'].astype(str) + '\n'
+                  + df_chart['Total Curah Hujan Tahunan (mm)'].map('{:.1f} mm'.format) + '\n('
+                  + df_chart['Bulan_Max_Curah_Hujan'].astype(str) + ')').to_numpy()
+
+    high, medium = thresholds
+    title = (f'Klasifikasi Curah Hujan per Stasiun per Tahun (Threshold: Tinggi > {high:g}mm, '
+             f'Sedang {medium:g}-{high:g}mm, Rendah < {medium:g}mm)')
+
+    pages = _pages(len(df_chart), CLASSIFICATION_BARS_PER_PAGE)
+    written = []
+    for page, rows in enumerate(pages, start=1):
+        n = len(rainfall[rows])
+
+        # Create figure and axis; taller pages for many bars
+        plt.figure(figsize=(12, max(10, 0.45 * n)))
+
+        # Create horizontal bar chart with random colors for each bar
+        bars = plt.barh(range(n), rainfall[rows], color=_random_colors(n))
+
+        # Customize the chart
+        plt.title(_page_title(title, page, len(pages)), fontsize=14, fontweight='bold')
+        plt.xlabel('Total Curah Hujan Tahunan (mm)', fontsize=12)
+        plt.ylabel('Stasiun dan Tahun', fontsize=12)
+
+        # Set y-axis labels with station names and years
+        plt.yticks(range(n), station_year[rows])
+
+        # Add classification labels and month information at the end of each bar
+        plt.gca().bar_label(bars, labels=bar_labels[rows], padding=4, fontsize=8, fontweight='bold')
+
+        # Add grid for better readability
+        plt.grid(axis='x', alpha=0.3)
+
+        # Adjust layout to prevent label cutoff
+        plt.tight_layout()
+
+        # Save the chart
+        path = _page_path(output_path, page, len(pages))
+        saved = _save(path, output)
+        written.extend(saved)
+        _finish(show)
+
+        print(f"Bar chart saved as {', '.join(saved)}")
+    return written
+
+
+# --- Diagram rata rata curah hujan ---
+def plot_average(df_avg, output_path='diagram_batang_rata_rata_curah_hujan_FIXED.png', period='2020-2024', show=True,
+                 output=None):
+    stations = df_avg['Nama Stasiun Hujan'].astype(str).to_numpy()
+    rainfall = df_avg['Rata-rata Curah Hujan Tahunan (mm)'].to_numpy()
+
+    pages = _pages(len(df_avg), STATION_BARS_PER_PAGE)
+    written = []
+    for page, rows in enumerate(pages, start=1):
+        n = len(rainfall[rows])
+
+        # Create figure and axis
+        plt.figure(figsize=(max(10, 0.3 * n), 8))
+
+        # Create vertical bar chart with random colors for each bar
+        bars = plt.bar(stations[rows], rainfall[rows], color=_random_colors(n))
+
+        # Customize the chart
+        plt.title(_page_title(f'Rata-rata Curah Hujan Tahunan per Stasiun ({period})', page, len(pages)), fontsize=16, fontweight='bold')
+        plt.xlabel('Nama Stasiun Hujan', fontsize=12)
+        plt.ylabel('Rata-rata Curah Hujan Tahunan (mm)', fontsize=12)
+
+        # Rotate x-axis labels for better readability
+        plt.xticks(rotation=45, ha='right')
+
+        # Add value labels on top of each bar
+        plt.gca().bar_label(bars, fmt='%.2f mm', padding=3, fontsize=10, fontweight='bold')
+
+        # Add grid for better readability
+        plt.grid(axis='y', alpha=0.3)
+
+        # Adjust layout to prevent label cutoff
+        plt.tight_layout()
+
+        # Save the chart
+        path = _page_path(output_path, page, len(pages))
+        saved = _save(path, output)
+        written.extend(saved)
+        _finish(show)
+
+        print(f"Bar chart for average rainfall saved as {', '.join(saved)}")
+    return written
+
+
+# --- Diagram curah hujan tertinggi ---
+def plot_max_rainfall(df_max_info, output_path='diagram_batang_curah_hujan_tertinggi.png', span=None, show=True,
+                      output=None):
+    stations = df_max_info['Stasiun'].astype(str).to_numpy()
+    rainfall = df_max_info['Curah Hujan Tertinggi'].to_numpy()
+
+    pages = _pages(len(df_max_info), STATION_BARS_PER_PAGE)
+    written = []
+    for page, rows in enumerate(pages, start=1):
+        # Membuat diagram batang
+        plt.figure(figsize=(max(12, 0.3 * len(rainfall[rows])), 8))
+        bars = plt.bar(stations[rows], rainfall[rows],
+                       color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4'])
+
+        # Menambahkan label nilai di atas setiap batang
+        plt.gca().bar_label(bars, fmt='%.1f mm', fontsize=10, fontweight='bold')
+
+        # Menambahkan judul dan label
+        plt.title(_page_title(f'Curah Hujan Tertinggi Setiap Stasiun{_span_label(span)}', page, len(pages)), fontsize=16, fontweight='bold', pad=20)
+        plt.xlabel('Stasiun Hujan', fontsize=12)
+        plt.ylabel('Curah Hujan (mm)', fontsize=12)
+        plt.xticks(rotation=45, ha='right')
+        plt.grid(axis='y', alpha=0.3)
+
+        # Menyesuaikan layout
+        plt.tight_layout()
+
+        # Menyimpan diagram
+        path = _page_path(output_path, page, len(pages))
+        saved = _save(path, output)
+        written.extend(saved)
+        _finish(show)
+
+        print(f"Diagram batang disimpan sebagai: {', '.join(saved)}")
+    print("Analisis curah hujan tertinggi per stasiun telah selesai!")
+    return written
+
+
+# --- Diagram pie persentase curah hujan ---
+def plot_percentage(share, output_path='diagram_pie_persentase_curah_hujan.png', span=None, show=True, output=None):
+    station_totals = share['Total Curah Hujan (mm)']
+    percentages = share['Persentase (%)']
+    total_rainfall = station_totals.sum()
+
+    # Too many wedges are unreadable: keep the largest stations, merge the rest
+    if len(share) > PIE_MAX_WEDGES:
+        largest = station_totals.nlargest(PIE_MAX_WEDGES - 1).index
+        rest = ~station_totals.index.isin(largest)
+        label = f'Lainnya ({rest.sum()} stasiun)'
+        station_totals = pd.concat([station_totals[largest], pd.Series({label: station_totals[rest].sum()})])
+        percentages = pd.concat([percentages[largest], pd.Series({label: percentages[rest].sum()})])
+
+    # Create pie chart
+    plt.figure(figsize=(12, 8))
+    colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99']
+
+    # Create pie chart with percentages
+    wedges, texts, autotexts = plt.pie(percentages,
+                                       labels=station_totals.index.astype(str),
+                                       colors=colors,
+                                       autopct='%1.1f%%',
+                                       startangle=90,
+                                       textprops={'fontsize': 12})
+
+    # Enhance the appearance
+    plt.title(f'Persentase Total Curah Hujan per Stasiun{_span_label(span)}',
+              fontsize=16, fontweight='bold', pad=20)
+
+    # Add total rainfall information
+    total_text = f'Total Curah Hujan: {total_rainfall:.1f} mm'
+    plt.figtext(0.5, 0.02, total_text, ha='center', fontsize=12, fontweight='bold')
+
+    # Create a legend with rainfall amounts
+    legend_labels = [f'{station}: {rainfall:.1f} mm ({pct:.1f}%)'
+                     for station, rainfall, pct in zip(station_totals.index, station_totals, percentages)]
+    plt.legend(wedges, legend_labels, title="Stasiun", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
+
+    # Adjust layout to prevent legend cutoff
+    plt.tight_layout()
+
+    # Save the chart
+    written = _save(output_path, output)
+
+    # Show the chart
+    _finish(show)
+    return written
+
+
+# --- Bar Chart with Random Colors for All Stations per Month ---
+def plot_monthly_season(station_monthly_avg, month_order,
+                        output_path='diagram_batang_klasifikasi_bulanan_curah_hujan.png', period='2020-2024', show=True,
+                        season_threshold=50, output=None):
+    # Station x month tables of averages (0 where a station has no data for a month) and seasons
+    stations = station_monthly_avg['Nama Stasiun Hujan'].unique()
+    months = month_order
+    by_cell = station_monthly_avg.set_index(['Nama Stasiun Hujan', 'Bulan'])
+    table = (by_cell['Rata-rata Curah Hujan (mm)']
+             .unstack().reindex(index=stations, columns=months).fillna(0).to_numpy())
+    seasons = (by_cell['Klasifikasi Musim'].astype(str)
+               .unstack().reindex(index=stations, columns=months).fillna('').to_numpy())
+
+    # Season classification and value label of every bar, empty for missing months
+    labels = seasons.astype(object) + '\n' + np.char.mod('%.1f', table).astype(object)
+    labels[table <= 0] = ''
+
+    # Create position for each bar
+    x_pos = np.arange(len(months))
+
+    pages = _pages(len(stations), STATIONS_PER_MONTHLY_PAGE)
+    written = []
+    for page, rows in enumerate(pages, start=1):
+        page_stations = stations[rows]
+        bar_width = 0.8 / max(len(page_stations), 4)
+
+        plt.figure(figsize=(16, 10))
+
+        # Create bars for each station, with a random color per station
+        for i, (station, values, bar_labels) in enumerate(zip(page_stations, table[rows], labels[rows])):
+            bars = plt.bar(x_pos + i * bar_width, values,
+                           width=bar_width, label=station, color=tuple(np.random.random(3)))
+
+            # Add season classification and value labels on top of each bar
+            plt.gca().bar_label(bars, labels=bar_labels, padding=2, fontsize=7, fontweight='bold')
+
+        # Customize the chart
+        plt.title(_page_title(f'Klasifikasi Musim per Stasiun Berdasarkan Rata-rata Curah Hujan Bulanan ({period})', page, len(pages)),
+                  fontsize=16, fontweight='bold', pad=20)
+        plt.xlabel('Bulan', fontsize=12)
+        plt.ylabel('Rata-rata Curah Hujan (mm)', fontsize=12)
+
+        # Set x-axis labels
+        plt.xticks(x_pos + bar_width * (len(page_stations) - 1) / 2, months, rotation=45, ha='right')
+
+        # Add a horizontal line to separate kemarau and hujan seasons
+        plt.axhline(y=season_threshold, color='red', linestyle='--', alpha=0.7, linewidth=2)
+        plt.text(len(months)/2, season_threshold + 5, f'Batas Kemarau/Hujan ({season_threshold:g}mm)',
+                 ha='center', va='bottom', fontsize=10, color='red', fontweight='bold')
+
+        # Add legend
+        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+
+        # Add grid for better readability
+        plt.grid(axis='y', alpha=0.3)
+
+        # Adjust layout to prevent label cutoff
+        plt.tight_layout()
+
+        # Save the chart
+        path = _page_path(output_path, page, len(pages))
+        saved = _save(path, output)
+        written.extend(saved)
+        _finish(show)
+
+        print(f"Bar chart saved as {', '.join(saved)}")
+    return written
+
+
+# --- Headless parallel rendering ---
+def _output_path(name, output_dir):
+    """The default file name of a plot function, placed in output_dir."""
+    default = inspect.signature(globals()[name]).parameters['output_path'].default
+    return os.path.join(output_dir, default)
+
+
+def chart_jobs(results, month_order, period, only=None, output_dir='.',
+               annual_thresholds=(700, 500), season_threshold=50, output=None, span=None):
+    """
+    Picklable (function name, args, kwargs) jobs for the five charts, or
+    only for the analyses named in `only`, saving into output_dir with the
+    given output options (see OUTPUT). period is the selected period and
+    span the years in the data ('first-last'), shown on the all-years charts.
+    """
+    # Keyword arguments passed to every plot function that accepts them
+    options = {'period': period, 'span': span, 'thresholds': annual_thresholds,
+               'season_threshold': season_threshold, 'output': {**OUTPUT, **(output or {})}}
+    # Analysis -> (plot function, result keys passed as arguments, extra arguments)
+    charts = {
+        'classification': ('plot_classification', ['classification'], ()),
+        'average': ('plot_average', ['average'], ()),
+        'max_rainfall': ('plot_max_rainfall', ['max_rainfall'], ()),
+        'percentage': ('plot_percentage', ['percentage'], ()),
+        'season': ('plot_monthly_season', ['station_monthly_avg'], (month_order,)),
+    }
+    jobs = []
+    for name, (fn, keys, extra) in charts.items():
+        if only is not None and name not in only:
+            continue
+        accepted = inspect.signature(globals()[fn]).parameters
+        kwargs = {option: value for option, value in options.items() if option in accepted}
+        kwargs['output_path'] = _output_path(fn, output_dir)
+        jobs.append((fn, tuple(results[key] for key in keys) + extra, kwargs))
+    return jobs
+
+
+def show_charts(jobs):
+    """Draw chart jobs one after another in this process, showing each figure."""
+    for name, args, kwargs in jobs:
+        globals()[name](*args, **kwargs)
+
+
+def render_job(job):
+    """
+    Render one chart job with the Agg backend. Runs inside a worker process
+    and returns a timing record for the run profile.
+    """
+    name, args, kwargs = job
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    plt.switch_backend('Agg')
+    files = globals()[name](*args, show=False, **kwargs)
+    plt.close('all')
+    return {
+        'stage': f'chart:{name}',
+        'rows': len(args[0]),
+        'wall_seconds': round(time.perf_counter() - wall_start, 4),
+        'cpu_seconds': round(time.process_time() - cpu_start, 4),
+        'pid': os.getpid(),
+        'files': files,
+    }
+
+
+def job_hash(job):
+    """SHA-256 of a chart job: plot function, input data and options (output path included)."""
+    name, args, kwargs = job
+    digest = hashlib.sha256(f'{CHART_VERSION}:{name}'.encode())
+    for arg in args:
+        if isinstance(arg, (pd.DataFrame, pd.Series)):
+            digest.update(repr(list(arg.columns) if isinstance(arg, pd.DataFrame) else arg.name).encode())
+            digest.update(pd.util.hash_pandas_object(arg, index=True).values.tobytes())
+        else:
+            digest.update(repr(arg).encode())
+    digest.update(json.dumps(kwargs, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def load_manifest(path):
+    """Chart manifest: plot function -> {'hash', 'files'} of the last render."""
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_charts(jobs, parallel=True, max_workers=None, manifest_path=None):
+    """
+    Render chart jobs headless. With parallel=True each job runs in its own
+    process, so the total time is close to the slowest single chart.
+    Workers are spawned (not forked) because the Excel sink may be running
+    in a background thread of this process. Returns one timing record per
+    chart.
+
+    With manifest_path, a job whose hash (job_hash) and files match the
+    manifest is not drawn; its record has 'skipped': True. The manifest is
+    updated with the charts drawn this time.
+    """
+    manifest = load_manifest(manifest_path) if manifest_path else {}
+    hashes = [job_hash(job) for job in jobs] if manifest_path else [None] * len(jobs)
+    records, pending = [], []
+    for job, digest in zip(jobs, hashes):
+        entry = manifest.get(job[0])
+        if digest is not None and entry and entry['hash'] == digest and all(map(os.path.exists, entry['files'])):
+            records.append({'stage': f'chart:{job[0]}', 'rows': len(job[1][0]), 'skipped': True,
+                            'files': entry['files']})
+        else:
+            pending.append((job, digest))
+
+    rendered = process_map(render_job, [job for job, _ in pending], parallel=parallel, max_workers=max_workers)
+
+    if manifest_path and pending:
+        for (job, digest), record in zip(pending, rendered):
+            manifest[job[0]] = {'hash': digest, 'files': record['files']}
+        with open(manifest_path, 'w') as fh:
+            json.dump(manifest, fh, indent=1)
+    return records + rendered
@@ -0,0 +1,190 @@
+"""
+Incremental recomputation when rows are appended to the source.
+
+The per-(station, year, month) cells of streaming.RunningAggregates are
+saved next to the workbook, together with the number of source rows
+already folded in and a copy of the last of those rows. On the next run
+only the rows after that position are read and merged into the cells. The
+analyses are re-derived from the cells (O(station-months)).
+
+Which result tables need rewriting is decided per output directory: a
+manifest there (OUTPUT_MANIFEST) holds, for every table format and
+analysis, the fingerprint of the results last written and the files
+written. A table is rewritten when its results changed or one of its files
+is missing, and the manifest is only updated once the tables were written.
+Charts are skipped through diagram's own chart manifest.
+
+If the source shrank or the last seen row no longer matches (rows edited
+or reordered rather than appended), the saved state is discarded and
+rebuilt from the whole source. Delete the output manifest to force a full
+rewrite of the tables.
+"""
+import hashlib
+import itertools
+import json
+import numbers
+import os
+import pickle
+
+import pandas as pd
+
+from curah_hujan import ANNUAL_RULES, ROLLING_YEARS, SEASON_RULES
+from streaming import CHUNKSIZE, RunningAggregates, analyses_from_cells, iter_chunks
+
+STATE_VERSION = 3
+
+# Fingerprints and files of the result tables written to an output directory
+OUTPUT_MANIFEST = '.incremental_outputs.json'
+
+
+def state_path_for(path):
+    """Return the incremental state file path for a source workbook."""
+    return os.path.splitext(path)[0] + '.state.pkl'
+
+
+def result_fingerprint(results, name):
+    """SHA-256 of the result frame(s) behind one analysis' outputs."""
+    if name == 'season':
+        frames = [results['monthly_avg'], results['station_monthly_avg']]
+    else:
+        frames = [results[name]]
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def _row_key(row):
+    """
+    Comparable form of one raw source row. Numbers are normalised to float
+    because a column's dtype depends on the other rows of its chunk.
+    """
+    key = []
+    for value in row:
+        if isinstance(value, numbers.Number) and not isinstance(value, bool):
+            value = float(value)
+        key.append(str(value))
+    return key
+
+
+def load_state(state_path):
+    try:
+        with open(state_path, 'rb') as fh:
+            state = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(state_path, state):
+    # Write to a temporary file first so an interrupted run never leaves a
+    # truncated state behind
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'wb') as fh:
+        pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, state_path)
+
+
+def load_output_manifest(output_dir):
+    """Output manifest of a directory: format -> analysis -> {'fingerprint', 'files'}."""
+    try:
+        with open(os.path.join(output_dir, OUTPUT_MANIFEST)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def stale_outputs(results, names, output_dir, formats):
+    """
+    The analyses of `names` whose tables in output_dir must be (re)written
+    in one of `formats`: never written there, results changed since, or a
+    written file is missing.
+    """
+    manifest = load_output_manifest(output_dir)
+    stale = []
+    for name in names:
+        fingerprint = result_fingerprint(results, name)
+        entries = [manifest.get(fmt, {}).get(name) for fmt in formats]
+        if any(entry is None or entry['fingerprint'] != fingerprint or not all(map(os.path.exists, entry['files']))
+               for entry in entries):
+            stale.append(name)
+    return stale
+
+
+def record_outputs(results, written, output_dir):
+    """
+    Add the tables written to output_dir to its manifest. written maps
+    (analysis, format) to the written paths (curah_hujan.export_tables).
+    """
+    manifest = load_output_manifest(output_dir)
+    for (name, fmt), paths in written.items():
+        manifest.setdefault(fmt, {})[name] = {'fingerprint': result_fingerprint(results, name),
+                                             'files': [os.path.abspath(path) for path in paths]}
+    with open(os.path.join(output_dir, OUTPUT_MANIFEST), 'w') as fh:
+        json.dump(manifest, fh, indent=1)
+
+
+def _resume(path, state, chunksize):
+    """
+    Return (aggregates, chunks) continuing from the saved state, or None if
+    the source no longer starts with the rows the state was built from.
+    """
+    if state is None or state['rows_read'] == 0:
+        return None
+    # Re-read from the last seen row to confirm the source was only appended to
+    chunks = iter_chunks(path, chunksize, skip=state['rows_read'] - 1)
+    first = next(chunks, None)
+    if first is None or first.empty or _row_key(first.iloc[0]) != state['last_row']:
+        return None
+
+    aggregates = RunningAggregates()
+    aggregates.cells = state['cells']
+    aggregates.rows_read = state['rows_read']
+    aggregates.rows_kept = state['rows_kept']
+    return aggregates, itertools.chain([first.iloc[1:]], chunks)
+
+
+def run_incremental(path, year_start, year_end, state_path=None, chunksize=CHUNKSIZE,
+                    stations=None, only=None, annual_rules=ANNUAL_RULES, season_rules=SEASON_RULES,
+                    rolling_years=ROLLING_YEARS):
+    """
+    Fold rows appended since the last run into the saved aggregates.
+
+    Returns (results, new_rows): the analyses of `only` (same keys as
+    streaming.analyses_from_cells) and the number of source rows read this
+    time. See stale_outputs for the tables that need rewriting.
+    """
+    state_path = state_path or state_path_for(path)
+    state = load_state(state_path)
+
+    resumed = _resume(path, state, chunksize)
+    if resumed is not None:
+        aggregates, chunks = resumed
+        last_row = state['last_row']
+    else:
+        aggregates, chunks = RunningAggregates(), iter_chunks(path, chunksize)
+        last_row = None
+
+    start = aggregates.rows_read
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        last_row = _row_key(chunk.iloc[-1])
+        aggregates.add(chunk)
+    if aggregates.cells is None:
+        raise ValueError(f"No rainfall rows found in {path}")
+
+    results = analyses_from_cells(aggregates.cells, year_start, year_end, stations, annual_rules, season_rules,
+                                  rolling_years, only)
+
+    save_state(state_path, {
+        'version': STATE_VERSION,
+        'cells': aggregates.cells,
+        'rows_read': aggregates.rows_read,
+        'rows_kept': aggregates.rows_kept,
+        'last_row': last_row,
+    })
+    return results, aggregates.rows_read - start
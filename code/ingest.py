@@ -0,0 +1,92 @@
+"""
+Concurrent ingestion of several rainfall workbooks.
+
+Upstream may deliver one workbook (or CSV) per province or per year
+instead of a single file. load_sources accepts a directory or a glob
+pattern, parses the files in a process pool and concatenates them into
+one typed frame, as curah_hujan.load_rainfall_data returns for a single
+file. Each file goes through the same columnar cache and nine-column
+schema check as a single source. A file that fails to parse is reported
+and skipped; the run only fails if no file could be read.
+"""
+import glob
+import os
+import time
+
+import pandas as pd
+
+from curah_hujan import compact_rainfall_frame, load_rainfall_data_cached, restore_constants
+from parallel import process_map
+
+# File types read as rainfall sources
+SOURCE_EXTENSIONS = ('.xlsx', '.xlsm', '.csv')
+
+
+def expand_sources(path):
+    """
+    Sorted source files of a directory or glob pattern. Cache files and
+    Excel lock files (~$name.xlsx) are skipped.
+    """
+    pattern = os.path.join(path, '*') if os.path.isdir(path) else path
+    return sorted(
+        name for name in glob.glob(pattern)
+        if os.path.isfile(name)
+        and name.lower().endswith(SOURCE_EXTENSIONS)
+        and not os.path.basename(name).startswith('~$')
+    )
+
+
+def parse_source(path):
+    """
+    Load one source file. Runs inside a worker process and returns
+    (frame or None, report record); errors are recorded, not raised.
+    """
+    start = time.perf_counter()
+    record = {'file': path, 'rows': 0, 'seconds': None, 'error': None}
+    try:
+        data = load_rainfall_data_cached(path)
+        record['rows'] = len(data)
+    except Exception as e:
+        data = None
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = round(time.perf_counter() - start, 4)
+    return data, record
+
+
+def load_sources(path, parallel=True, max_workers=None):
+    """
+    Parse every source file of a directory or glob pattern concurrently.
+
+    Returns (frame, report): the concatenated typed frame and one record per
+    file with its row count, parse time and error (None on success).
+    Files are parsed in spawned worker processes (parallel.process_map).
+    """
+    files = expand_sources(path)
+    if not files:
+        raise ValueError(f"No source files ({', '.join(SOURCE_EXTENSIONS)}) match {path}")
+
+    parsed = process_map(parse_source, files, parallel=parallel, max_workers=max_workers)
+
+    frames = [data for data, _ in parsed if data is not None]
+    report = [record for _, record in parsed]
+    if not frames:
+        raise ValueError(f"None of the {len(files)} source files in {path} could be read")
+
+    # A column may be constant (and dropped) in one file but not across files,
+    # so put the constants back; columns whose categories differ between
+    # files concatenate as plain values and get one shared dictionary below
+    raw_bytes = sum(data.attrs['memory']['raw_mb'] * 2**20 for data in frames if data.attrs.get('memory'))
+    combined = pd.concat([restore_constants(data) for data in frames], ignore_index=True)
+    combined.attrs = {}
+    return compact_rainfall_frame(combined, raw_bytes=raw_bytes or None), report
+
+
+def print_report(report):
+    print(f"{'File':<40} {'Rows':>10} {'Seconds':>10}  Status")
+    print("-" * 70)
+    for record in report:
+        status = 'OK' if record['error'] is None else f"GAGAL - {record['error']}"
+        print(f"{os.path.basename(record['file']):<40} {record['rows']:>10} {record['seconds']:>10.3f}  {status}")
+    print("-" * 70)
+    failed = sum(record['error'] is not None for record in report)
+    print(f"{len(report) - failed} of {len(report)} files loaded, {sum(r['rows'] for r in report)} rows")
@@ -0,0 +1,143 @@
+"""
+On-disk memo of analysis results.
+
+Each analysis result is stored under a key built from the fingerprint of
+the input frame and the parameters that analysis depends on (year range,
+thresholds), so changing the seasonal threshold only recomputes the
+seasonal tables while the other results are served from the memo:
+
+    classification, average   year range + annual thresholds
+    season                    year range + seasonal threshold
+    rolling                   year range + window
+    risk                      year range + annual and seasonal thresholds
+    max_rainfall, percentage  input only (all years)
+
+Entries are pickle files in one directory. A hit refreshes the file's
+mtime; when the directory grows beyond max_bytes the least recently used
+entries are deleted.
+"""
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+# Bump when the layout of a result frame changes, to ignore older entries
+MEMO_VERSION = 1
+
+# Result frames stored for each analysis
+RESULT_KEYS = {
+    'classification': ['classification'],
+    'average': ['average'],
+    'max_rainfall': ['max_rainfall'],
+    'percentage': ['percentage'],
+    'season': ['monthly_avg', 'station_monthly_avg'],
+    'rolling': ['rolling'],
+    'risk': ['risk'],
+}
+
+
+def frame_fingerprint(data):
+    """SHA-256 of a frame's column names, dtypes and values."""
+    digest = hashlib.sha256()
+    digest.update(repr([(col, str(dtype)) for col, dtype in data.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def analysis_params(name, year_start, year_end, annual_rules, season_rules, rolling_years):
+    """The parameters one analysis' result depends on."""
+    if name == 'classification':
+        return {'years': [year_start, year_end], 'rules': annual_rules}
+    if name == 'average':
+        # Only the annual totals, not their classification
+        return {'years': [year_start, year_end]}
+    if name == 'season':
+        return {'years': [year_start, year_end], 'rules': season_rules}
+    if name == 'risk':
+        return {'years': [year_start, year_end], 'rules': [annual_rules, season_rules]}
+    if name == 'rolling':
+        return {'years': [year_start, year_end], 'window': rolling_years}
+    return {}
+
+
+class ResultCache:
+    def __init__(self, directory, max_bytes=256 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, name, fingerprint, params):
+        payload = json.dumps({'version': MEMO_VERSION, 'analysis': name, 'input': fingerprint, 'params': params},
+                             sort_keys=True, default=str)
+        return f"{name}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def get(self, key):
+        """The stored value, or None on a miss or an unreadable entry."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fh:
+                value = pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        # Mark as recently used
+        os.utime(path)
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used entries until the memo fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+def memoized_analyses(cache, fingerprint, names, params, compute):
+    """
+    Results of the analyses in `names`, taken from the memo where possible.
+
+    params maps each name to its parameters (see analysis_params);
+    compute(missing) must return a results dict holding at least the
+    analyses in `missing`. Returns (results, missing).
+    """
+    keys = {name: cache.key(name, fingerprint, params[name]) for name in names}
+    results, missing = {}, []
+    for name in names:
+        value = cache.get(keys[name])
+        if value is None:
+            missing.append(name)
+        else:
+            results.update(value)
+
+    if missing:
+        computed = compute(missing)
+        for name in missing:
+            value = {result_key: computed[result_key] for result_key in RESULT_KEYS[name]}
+            results.update(value)
+            try:
+                cache.put(keys[name], value)
+            except OSError as e:
+                print(f"Could not store {name} in the result memo: {e}")
+    return results, missing
@@ -0,0 +1,27 @@
+"""
+Process-pool map shared by the chart renderer, the multi-file ingest and
+the risk scores.
+
+Workers are spawned (not forked) because the Excel sink may be running in
+a background thread of the calling process. With a single worker the
+calls run in-process, since one worker process would only add start-up
+cost.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def process_map(fn, *iterables, parallel=True, max_workers=None):
+    """
+    list(map(fn, *iterables)), spread over up to max_workers (default: CPU
+    count) spawned processes. fn and its arguments must be picklable; the
+    first worker error is re-raised here.
+    """
+    calls = list(zip(*iterables))
+    workers = min(len(calls), max_workers or os.cpu_count() or 1)
+    if not parallel or workers <= 1:
+        return [fn(*args) for args in calls]
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(fn, *zip(*calls)))
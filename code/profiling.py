@@ -0,0 +1,112 @@
+"""
+Per-stage instrumentation of the rainfall pipeline.
+
+RunProfile records, for every stage wrapped in `with profile.stage(...)`,
+the wall time, CPU time, process peak RSS and row count, and writes them
+as a JSON run profile next to the outputs. With trace_memory=True the
+tracemalloc peak of each stage is recorded too; tracing slows every
+allocation, so the profile then notes that its timings were taken under
+tracemalloc. One chosen stage can additionally run under cProfile; its
+stats are dumped to profile_<stage>.prof in the output directory.
+"""
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 2)
+
+
+class RunProfile:
+    def __init__(self, enabled=True, trace_memory=False, profile_stage=None, output_dir='.'):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.profile_stage = profile_stage
+        self.output_dir = output_dir
+        self.stages = []
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, rows=None, in_thread=False):
+        """
+        Measure the enclosed block. The yielded record can be updated inside
+        the block, e.g. record['rows'] = len(df). Use in_thread=True for a
+        block running in a worker thread: CPU time is then that thread's,
+        and memory is not sampled because tracemalloc's peak is process-wide.
+        """
+        record = {'stage': name, 'rows': rows}
+        if not self.enabled:
+            yield record
+            return
+
+        trace = self.trace_memory and not in_thread
+        if trace:
+            tracemalloc.reset_peak()
+        cpu_clock = time.thread_time if in_thread else time.process_time
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+
+        wall_start, cpu_start = time.perf_counter(), cpu_clock()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 4)
+            record['cpu_seconds'] = round(cpu_clock() - cpu_start, 4)
+            record['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2) if trace else None
+            record['peak_rss_mb'] = peak_rss_mb()
+            if profiler is not None:
+                record['cprofile'] = self._dump(profiler, name)
+            self.add(record)
+
+    def add(self, record):
+        """Add a record measured elsewhere (e.g. in a worker process)."""
+        if self.enabled:
+            with self._lock:
+                self.stages.append(record)
+
+    def _dump(self, profiler, name):
+        file_name = 'profile_' + re.sub(r'[^A-Za-z0-9_.-]+', '_', name) + '.prof'
+        path = os.path.join(self.output_dir, file_name)
+        profiler.dump_stats(path)
+        return path
+
+    def write_json(self, path):
+        """Write the run profile to path (relative paths go into output_dir)."""
+        if not self.enabled:
+            return None
+        path = os.path.join(self.output_dir, path)
+        with open(path, 'w') as fh:
+            json.dump({
+                'started': self.started.isoformat(timespec='seconds'),
+                'total_wall_seconds': round(time.perf_counter() - self._start, 4),
+                'peak_rss_mb': peak_rss_mb(),
+                # Timings measured with tracemalloc running are inflated
+                'tracemalloc': self.trace_memory,
+                'stages': self.stages,
+            }, fh, indent=2)
+        return path
@@ -0,0 +1,127 @@
+"""
+Klasifikasi berdasarkan tingkat risiko (risk-based classification).
+
+Every station-month is compared with the same station's climatology for
+that calendar month, taken over every year in the data:
+
+    Rata-rata Klimatologi  mean of the station's totals for the month
+    Anomali                total - climatological mean
+    Z-Score                anomaly / sample standard deviation (NaN with
+                           fewer than two years or no spread)
+    Persentil              percentile rank among those years, ties
+                           counting half
+
+The percentile is mapped to a risk tier with RISK_RULES and reported next
+to the fixed-threshold Tinggi/Sedang/Rendah and Kemarau/Hujan labels. The
+scores are computed in one NumPy pass over dense station x year x month
+arrays (the cube layout); with many stations the station axis is split
+across worker processes.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from curah_hujan import (
+    ANNUAL_RULES,
+    SEASON_RULES,
+    classify_monthly_season,
+    classify_rainfall,
+    classify_values,
+    month_order,
+    monthly_matrix,
+    to_mm,
+)
+from parallel import process_map
+
+# Risk tiers by percentile of the station's climatology, first match wins
+RISK_RULES = [
+    ('Risiko Banjir Tinggi', '>=', 95),
+    ('Risiko Banjir', '>=', 80),
+    ('Risiko Kekeringan Tinggi', '<=', 5),
+    ('Risiko Kekeringan', '<=', 20),
+]
+RISK_DEFAULT = 'Normal'
+
+# Stations per worker process. One pass scores roughly 8000 stations x 30
+# years per second, so smaller inputs are cheaper in-process than the
+# start-up of spawned workers.
+PARALLEL_MIN_STATIONS = 5000
+
+
+def station_scores(values, has_data):
+    """
+    Climatological scores of (stations x years x months) monthly totals.
+
+    Returns (mean, std, z, percentile): mean and std have shape
+    (stations, 1, months), z and percentile the shape of values (NaN where
+    has_data is False).
+    """
+    n = has_data.sum(axis=1, keepdims=True)
+    filled = np.where(has_data, values, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=1, keepdims=True) / n
+        deviation = np.where(has_data, values - mean, 0.0)
+        std = np.sqrt((deviation ** 2).sum(axis=1, keepdims=True) / (n - 1))
+        z = np.where(has_data & (n > 1) & (std > 0), (values - mean) / std, np.nan)
+
+        # Compare every year with every other year of the same station-month
+        other, valid = filled[:, None], has_data[:, None]
+        below = ((other < filled[:, :, None]) & valid).sum(axis=2)
+        equal = ((other == filled[:, :, None]) & valid).sum(axis=2)
+        percentile = np.where(has_data, 100 * (below + 0.5 * equal) / n, np.nan)
+    return mean, std, z, percentile
+
+
+def score_stations(values, has_data, parallel=True, max_workers=None):
+    """
+    station_scores over all stations, split across spawned worker
+    processes (parallel.process_map) when there are many stations.
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(values) // PARALLEL_MIN_STATIONS)
+    if not parallel or workers <= 1:
+        return station_scores(values, has_data)
+
+    parts = np.array_split(np.arange(len(values)), workers)
+    scored = process_map(station_scores, [values[part] for part in parts], [has_data[part] for part in parts],
+                         max_workers=workers)
+    return tuple(np.concatenate(arrays) for arrays in zip(*scored))
+
+
+def build_risk(stations, years, monthly_sum, monthly_count, year_start, year_end,
+               annual_rules=ANNUAL_RULES, season_rules=SEASON_RULES, parallel=True):
+    """
+    Risk table of every station-month in the period from (stations x years
+    x 12) monthly totals and row counts over the contiguous `years`. The
+    climatology uses every year, also those outside the period.
+    """
+    has_data = monthly_count > 0
+    mean, _, z, percentile = score_stations(monthly_sum, has_data, parallel)
+
+    in_period = (years >= year_start) & (years <= year_end)
+    si, yi, mi = np.nonzero(has_data & in_period[None, :, None])
+    value = to_mm(monthly_sum[si, yi, mi])
+    annual_total = to_mm(monthly_sum.sum(axis=2)[si, yi])
+    return pd.DataFrame({
+        'Nama Stasiun Hujan': stations[si],
+        'Tahun': years[yi],
+        'Bulan': np.asarray(month_order)[mi],
+        'Curah Hujan (mm)': value,
+        'Rata-rata Klimatologi (mm)': to_mm(mean[si, 0, mi]),
+        'Anomali (mm)': to_mm(monthly_sum[si, yi, mi] - mean[si, 0, mi]),
+        'Z-Score': z[si, yi, mi].round(2),
+        'Persentil': percentile[si, yi, mi].round(1),
+        'Klasifikasi Tahunan': classify_rainfall(annual_total, annual_rules),
+        'Klasifikasi Musim': classify_monthly_season(value, season_rules),
+        'Klasifikasi Risiko': classify_values(percentile[si, yi, mi], RISK_RULES, RISK_DEFAULT),
+    })
+
+
+def analyze_risk(df, year_start, year_end, annual_rules=ANNUAL_RULES, season_rules=SEASON_RULES):
+    """Risk table from a cleaned rainfall frame (all its years form the climatology)."""
+    stations, periods, monthly_sum, monthly_count = monthly_matrix(df)
+    # The periods span whole calendar years: reshape to stations x years x months
+    shape = (len(stations), -1, 12)
+    years = np.unique(periods.year)
+    return build_risk(stations, years, monthly_sum.reshape(shape), monthly_count.reshape(shape),
+                      year_start, year_end, annual_rules, season_rules)
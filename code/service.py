@@ -0,0 +1,223 @@
+"""
+Layanan HTTP/JSON ringkasan curah hujan.
+
+A long-running local service that keeps the analysis results warm in
+memory, so dashboards can query them without reloading the workbook:
+
+    GET /health                      source, period, time and size of the last reload
+    GET /stations                    station names
+    GET /analyses/<name>             result table(s) of one analysis
+    GET /stations/<name>             every analysis for one station
+
+/analyses and /stations/<name> accept ?station=NAME (case-insensitive)
+and ?year=YYYY to narrow the rows. Results are indexed by station when
+they are loaded, so a query only serialises the matching rows.
+
+The results are derived from per-(station, year, month) cells kept by
+incremental.run_incremental under a state file of the service's own. At
+most every CHECK_INTERVAL seconds a request checks the source's size and
+mtime; when it changed, only the appended rows are folded in (or the cells
+are rebuilt if rows were edited) before the request is answered.
+
+Contoh:
+    python service.py --input "Data Jumlah curah hujan UPDATE.xlsx" --port 8050
+    curl "http://127.0.0.1:8050/stations/kuripan?year=2022"
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import curah_hujan as ch
+import incremental
+from memo import RESULT_KEYS
+
+# Minimum seconds between two checks of the source file for changes
+CHECK_INTERVAL = 1.0
+
+# Station column of the result tables (max_rainfall names it 'Stasiun';
+# percentage is indexed by station)
+STATION_COLUMNS = ['Nama Stasiun Hujan', 'Stasiun']
+
+
+def state_path_for(path):
+    """Incremental state of the service, kept apart from that of the CLI's --incremental runs."""
+    return os.path.splitext(path)[0] + '.service.state.pkl'
+
+
+def _station_column(frame):
+    return next((col for col in STATION_COLUMNS if col in frame.columns), None)
+
+
+def index_by_station(frame):
+    """Positions of every station's rows, keyed by upper-case station name."""
+    col = _station_column(frame)
+    if col is None:
+        return None
+    return {str(name).upper(): positions
+            for name, positions in frame.groupby(frame[col].astype(str), sort=False).indices.items()}
+
+
+def records(frame):
+    """Rows of a result table as JSON-ready dicts."""
+    return json.loads(frame.to_json(orient='records', force_ascii=False))
+
+
+class RainfallService:
+    def __init__(self, source, year_start=ch.YEAR_START, year_end=ch.YEAR_END, **options):
+        self.source = source
+        self.year_start = year_start
+        self.year_end = year_end
+        self.options = options
+        self.state_path = state_path_for(source)
+        self.lock = threading.Lock()
+        # (tables, indexes, stations), replaced as a whole on reload so a
+        # request never sees tables and indexes of different reloads
+        self.snapshot = ({}, {}, [])
+        self.signature = None
+        self.checked_at = 0.0
+        self.info = {'source': source, 'years': [year_start, year_end], 'reloads': 0,
+                     'loaded_at': None, 'reload_rows': None, 'reload_seconds': None}
+        self.reload()
+
+    def _source_signature(self):
+        stat = os.stat(self.source)
+        return stat.st_size, stat.st_mtime_ns
+
+    def reload(self):
+        """Fold the rows appended to the source into the cells and re-derive the results."""
+        start = time.perf_counter()
+        signature = self._source_signature()
+        results, new_rows = incremental.run_incremental(
+            self.source, self.year_start, self.year_end, state_path=self.state_path, **self.options)
+
+        tables = {}
+        for name in ch.ANALYSES:
+            for key in RESULT_KEYS[name]:
+                frame = results[key]
+                if _station_column(frame) is None and frame.index.name == 'Nama Stasiun Hujan':
+                    frame = frame.reset_index()
+                tables[key] = frame.reset_index(drop=True)
+        indexes = {key: index_by_station(frame) for key, frame in tables.items()}
+        stations = sorted({str(name) for frame in tables.values() if _station_column(frame)
+                           for name in frame[_station_column(frame)].unique()})
+        self.snapshot = (tables, indexes, stations)
+        self.signature = signature
+        # reload_rows: source rows read by this reload (only the appended ones after the first)
+        self.info.update(reloads=self.info['reloads'] + 1, loaded_at=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                         reload_rows=new_rows, reload_seconds=round(time.perf_counter() - start, 4))
+
+    @property
+    def stations(self):
+        return self.snapshot[2]
+
+    def refresh(self):
+        """Reload if the source changed since the last check (checked at most every CHECK_INTERVAL s)."""
+        now = time.monotonic()
+        if now - self.checked_at < CHECK_INTERVAL:
+            return
+        with self.lock:
+            self.checked_at = now
+            if self._source_signature() != self.signature:
+                self.reload()
+
+    def query(self, key, station=None, year=None, snapshot=None):
+        """Rows of one result table, optionally for one station and/or year."""
+        tables, indexes, _ = snapshot or self.snapshot
+        frame = tables[key]
+        if station is not None:
+            index = indexes[key]
+            if index is not None:
+                frame = frame.iloc[index.get(station.upper(), [])]
+        if year is not None and 'Tahun' in frame.columns:
+            frame = frame[frame['Tahun'] == year]
+        return records(frame)
+
+    def analysis(self, name, station=None, year=None, snapshot=None):
+        snapshot = snapshot or self.snapshot
+        return {key: self.query(key, station, year, snapshot) for key in RESULT_KEYS[name]}
+
+    def station(self, station, year=None):
+        snapshot = self.snapshot
+        if station.upper() not in {name.upper() for name in snapshot[2]}:
+            raise KeyError(station)
+        return {name: self.analysis(name, station, year, snapshot) for name in ch.ANALYSES}
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Set by serve()
+    service = None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            year = int(params['year']) if 'year' in params else None
+        except ValueError:
+            return self._send(400, {'error': f"year must be an integer, not {params['year']!r}"})
+
+        service = self.service
+        try:
+            service.refresh()
+        except Exception as e:
+            # Keep answering from the last good results
+            print(f"Reload of {service.source} failed: {e}")
+
+        if parts == ['health']:
+            return self._send(200, service.info)
+        if parts == ['stations']:
+            return self._send(200, service.stations)
+        if len(parts) == 2 and parts[0] == 'analyses':
+            if parts[1] not in ch.ANALYSES:
+                return self._send(404, {'error': f"Unknown analysis {parts[1]!r}", 'analyses': ch.ANALYSES})
+            return self._send(200, service.analysis(parts[1], params.get('station'), year))
+        if len(parts) == 2 and parts[0] == 'stations':
+            try:
+                return self._send(200, service.station(parts[1], year))
+            except KeyError:
+                return self._send(404, {'error': f"Unknown station {parts[1]!r}"})
+        return self._send(404, {'error': f"Unknown path {url.path!r}",
+                                'paths': ['/health', '/stations', '/analyses/<name>', '/stations/<name>']})
+
+
+def serve(service, host='127.0.0.1', port=8050):
+    Handler.service = service
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving {service.source} on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     parents=[ch.analysis_options_parser()])
+    parser.add_argument('--input', default=ch.file_path, metavar='PATH', help='source workbook or CSV')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8050, help='port to listen on (default 8050)')
+    args = parser.parse_args(argv)
+    ch.check_analysis_options(parser, args)
+
+    start = time.perf_counter()
+    service = RainfallService(args.input, *args.years, **ch.analysis_options(args))
+    print(f"Loaded {len(service.stations)} stations in {time.perf_counter() - start:.2f} s")
+    serve(service, args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Partitioned on-disk store of the cleaned rainfall rows.
+
+The rows of a source workbook are kept next to it as a Hive-style Parquet
+dataset with one directory per province code and year:
+
+    <name>.store/Kode Provinsi=32/Tahun=2020/part-0.parquet
+
+read_store hands the province, year and station filters to pyarrow as a
+dataset filter. Partitions outside the province/year slice are never
+opened, and the station filter is checked against the row-group
+statistics of the remaining files before rows are decoded, so a report
+for one province or a few years reads only that slice of the archive.
+
+A small JSON manifest next to the dataset holds the source fingerprint
+(as the Feather cache sidecar) plus the province names and station names
+found in the data, used to resolve names case-insensitively before the
+filter is built. The store is rebuilt when the source changes.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from curah_hujan import (
+    COLUMNS,
+    cache_is_valid,
+    compact_rainfall_frame,
+    file_fingerprint,
+    load_rainfall_data_cached,
+    restore_constants,
+)
+
+# Bump when the stored columns or the partition layout change
+STORE_SCHEMA = 1
+
+# Directory levels of the dataset, outermost first
+PARTITION_COLUMNS = ['Kode Provinsi', 'Tahun']
+
+# Source position of every row, so a slice keeps the source order (the
+# max-rainfall analysis breaks ties by first occurrence)
+ROW_COLUMN = '_row'
+
+
+def store_paths(path):
+    """Return the (dataset directory, manifest) paths for a source workbook."""
+    base = os.path.splitext(path)[0]
+    return base + '.store', base + '.store.json'
+
+
+def write_store(data, root):
+    """
+    Write a cleaned frame as a partitioned dataset under root, replacing
+    any previous contents. Returns the manifest entries (provinces, stations).
+    """
+    data = restore_constants(data)
+    data = data.assign(**{ROW_COLUMN: np.arange(len(data), dtype='int64')})
+    shutil.rmtree(root, ignore_errors=True)
+    ds.write_dataset(pa.Table.from_pandas(data, preserve_index=False), root, format='parquet',
+                     partitioning=PARTITION_COLUMNS, partitioning_flavor='hive')
+
+    provinces = data[['Kode Provinsi', 'Nama Provinsi']].drop_duplicates().astype(str)
+    return {
+        'provinces': dict(zip(provinces['Kode Provinsi'], provinces['Nama Provinsi'])),
+        'stations': sorted(data['Nama Stasiun Hujan'].astype(str).unique()),
+    }
+
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def build_store(path):
+    """
+    Return (root, manifest) of the store of a source workbook, writing it
+    from the source first if it is missing or out of date.
+    """
+    root, manifest_path = store_paths(path)
+    if os.path.isdir(root) and cache_is_valid(path, manifest_path, STORE_SCHEMA):
+        manifest = load_manifest(manifest_path)
+        if manifest is not None:
+            return root, manifest
+
+    manifest = dict(file_fingerprint(path), schema=STORE_SCHEMA)
+    manifest.update(write_store(load_rainfall_data_cached(path), root))
+    with open(manifest_path, 'w') as fh:
+        json.dump(manifest, fh)
+    return root, manifest
+
+
+def _resolve(wanted, known, what):
+    """Names (or codes) of `known` matching `wanted` case-insensitively."""
+    wanted = {str(name).upper() for name in wanted}
+    found = [name for name in known if name.upper() in wanted]
+    if not found:
+        raise ValueError(f"None of the {what} {sorted(wanted)} found in the data")
+    return found
+
+
+def province_codes(manifest, provinces):
+    """Province codes named by code or by name in `provinces`."""
+    wanted = {str(name).upper() for name in provinces}
+    codes = [code for code, name in manifest['provinces'].items()
+             if code.upper() in wanted or name.upper() in wanted]
+    if not codes:
+        raise ValueError(f"None of the provinces {sorted(wanted)} found in the data")
+    return codes
+
+
+def store_filter(manifest, provinces=None, year_start=None, year_end=None, stations=None):
+    """pyarrow filter expression for a province / year range / station slice (None for all rows)."""
+    conditions = []
+    if provinces:
+        conditions.append(ds.field('Kode Provinsi').isin([int(code) for code in province_codes(manifest, provinces)]))
+    if year_start is not None:
+        conditions.append(ds.field('Tahun') >= year_start)
+    if year_end is not None:
+        conditions.append(ds.field('Tahun') <= year_end)
+    if stations:
+        conditions.append(ds.field('Nama Stasiun Hujan').isin(_resolve(stations, manifest['stations'], 'stations')))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_store(root, manifest, provinces=None, year_start=None, year_end=None, stations=None):
+    """
+    Read one slice of the store as a typed frame (as load_rainfall_data
+    returns), in source row order.
+
+    Returns (frame, scan): scan reports the partition files read out of
+    the total and the rows returned.
+    """
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    expression = store_filter(manifest, provinces, year_start, year_end, stations)
+    files_total = len(dataset.files)
+    fragments = list(dataset.get_fragments(filter=expression))
+
+    table = dataset.to_table(filter=expression)
+    data = table.to_pandas().sort_values(ROW_COLUMN, kind='stable')
+    data = data[[col for col in COLUMNS if col in data.columns]].reset_index(drop=True)
+    scan = {'files_read': len(fragments), 'files_total': files_total, 'rows': len(data)}
+    return compact_rainfall_frame(data, raw_bytes=table.nbytes), scan
+
+
+def load_slice(path, provinces=None, year_start=None, year_end=None, stations=None):
+    """Build (if needed) and read one slice of a source workbook's store. Returns (frame, scan)."""
+    root, manifest = build_store(path)
+    data, scan = read_store(root, manifest, provinces, year_start, year_end, stations)
+    if data.empty:
+        raise ValueError("No rainfall rows in the selected provinces, years and stations")
+    return data, scan
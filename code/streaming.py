@@ -0,0 +1,140 @@
+"""
+Streaming ingestion for rainfall sources that do not fit in memory.
+
+The source is read in row chunks (xlsx through openpyxl read-only mode, or
+CSV through pandas) and every chunk is folded into running aggregates per
+(station, year, month) cell: sum, count, max and the source row of the
+first maximum. All the analyses are then derived from those cells, so
+memory is bounded by the number of station-months, not by the row count.
+"""
+import itertools
+
+import pandas as pd
+
+from curah_hujan import (
+    ANNUAL_RULES,
+    COLUMNS,
+    ROLLING_YEARS,
+    SEASON_RULES,
+    check_header,
+    clean_rainfall_frame,
+    normalize_months,
+)
+from cube import KEYS, RainfallCube, analyses_from_cube, cells_from_frame
+
+# Rows per chunk
+CHUNKSIZE = 100_000
+
+
+def iter_excel_chunks(path, chunksize=CHUNKSIZE, skip=0):
+    """Yield raw DataFrame chunks from the first sheet of an xlsx file, after `skip` data rows."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # The same header check as a whole-file load (empty trailing cells aside)
+        header = list(next(sheet.iter_rows(max_row=1, values_only=True), ()))
+        while header and header[-1] is None:
+            header.pop()
+        check_header(header)
+
+        rows = sheet.iter_rows(min_row=2 + skip, values_only=True)
+        while True:
+            block = list(itertools.islice(rows, chunksize))
+            if not block:
+                break
+            yield pd.DataFrame([row[:len(COLUMNS)] for row in block], columns=COLUMNS)
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(path, chunksize=CHUNKSIZE, skip=0):
+    """Yield raw DataFrame chunks from a CSV file with the same nine columns, after `skip` data rows."""
+    # The header is checked and renamed to COLUMNS by clean_rainfall_frame
+    yield from pd.read_csv(path, chunksize=chunksize, skiprows=range(1, skip + 1))
+
+
+def iter_chunks(path, chunksize=CHUNKSIZE, skip=0):
+    if str(path).lower().endswith('.csv'):
+        return iter_csv_chunks(path, chunksize, skip)
+    return iter_excel_chunks(path, chunksize, skip)
+
+
+class RunningAggregates:
+    """
+    Per-(station, year, month) aggregates folded chunk by chunk.
+
+    cells is a DataFrame indexed by KEYS with columns
+    sum, count, max and max_seq (position of the first maximum in source
+    order, used to keep the first-occurrence tie-breaking of the in-memory
+    path).
+    """
+
+    def __init__(self):
+        self.cells = None
+        self.rows_read = 0
+        self.rows_kept = 0
+
+    def add(self, chunk):
+        """Clean one raw chunk and fold it into the running cells."""
+        self.rows_read += len(chunk)
+        chunk = clean_rainfall_frame(chunk)
+        if chunk.empty:
+            return
+        chunk['Tahun'] = chunk['Tahun'].astype('int16')
+        chunk['Bulan'] = normalize_months(chunk['Bulan'])
+        # Positions continue across chunks; only the relative order matters
+        part = cells_from_frame(chunk, seq_start=self.rows_kept)
+        self.rows_kept += len(chunk)
+        self.merge(part)
+
+    def merge(self, part):
+        """Combine another cell table (same layout) into this one."""
+        if self.cells is None:
+            self.cells = part
+            return
+        both = pd.concat([self.cells, part])
+        # Largest max first, earliest row first among equal maxima
+        both = both.sort_values(['max', 'max_seq'], ascending=[False, True])
+        grouped = both.groupby(level=list(range(len(KEYS))), sort=False)
+        self.cells = pd.DataFrame({
+            'sum': grouped['sum'].sum(),
+            'count': grouped['count'].sum(),
+            'max': grouped['max'].first(),
+            'max_seq': grouped['max_seq'].first(),
+        })
+
+
+def aggregate_source(path, chunksize=CHUNKSIZE):
+    """Stream a source file and return its RunningAggregates."""
+    aggregates = RunningAggregates()
+    for chunk in iter_chunks(path, chunksize):
+        aggregates.add(chunk)
+    return aggregates
+
+
+def analyses_from_cells(cells, year_start, year_end, stations=None,
+                        annual_rules=ANNUAL_RULES, season_rules=SEASON_RULES, rolling_years=ROLLING_YEARS,
+                        only=None):
+    """
+    Derive the analyses (or only those named in `only`) from per-(station,
+    year, month) cells, optionally for the named stations only.
+    Returns the same keys as curah_hujan.run_analyses except 'data'.
+    """
+    cube = RainfallCube.from_cells(cells)
+    if stations:
+        cube = cube.select_stations(stations)
+    return analyses_from_cube(cube, year_start, year_end, annual_rules, season_rules, rolling_years, only)
+
+
+def run_streaming_analyses(path, year_start, year_end, chunksize=CHUNKSIZE, stations=None,
+                           annual_rules=ANNUAL_RULES, season_rules=SEASON_RULES, rolling_years=ROLLING_YEARS,
+                           only=None):
+    """Stream the source and return (results, rows_read) with bounded memory."""
+    aggregates = aggregate_source(path, chunksize)
+    if aggregates.cells is None:
+        raise ValueError(f"No rainfall rows found in {path}")
+    results = analyses_from_cells(aggregates.cells, year_start, year_end, stations, annual_rules, season_rules,
+                                  rolling_years, only)
+    return results, aggregates.rows_read
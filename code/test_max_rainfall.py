@@ -0,0 +1,142 @@
+"""
+Regression test of the vectorised month-of-maximum lookups.
+
+analyze_classification and analyze_max_rainfall used to find the row of
+maximum rainfall with a groupby().apply(get_max_month) and a per-station
+loop. Those versions are kept here as the reference: on a synthetic frame
+with tied maxima and shuffled rows the row-based analyses, the cube
+(max_seq) and the streaming path (chunk merges) must all pick the same
+(first occurring) row.
+
+    python -m pytest -q test_max_rainfall.py
+"""
+import pandas as pd
+import pytest
+
+import cube
+import curah_hujan as ch
+import streaming
+from benchmark import generate_rainfall_data
+
+
+# --- Reference implementation (before the max-rainfall lookups were vectorised) ---
+def get_max_month(group):
+    max_rainfall = group['Jumlah Curah Hujan'].max()
+    # Get the month(s) with the maximum rainfall. If multiple, take the first one.
+    max_month = group[group['Jumlah Curah Hujan'] == max_rainfall]['Bulan'].iloc[0]
+    return max_month
+
+
+def classify_rainfall(total_rainfall):
+    if total_rainfall > 700:
+        return 'Tinggi'
+    elif total_rainfall >= 500:
+        return 'Sedang'
+    else:
+        return 'Rendah'
+
+
+def reference_classification(df_filtered):
+    annual_summary = df_filtered.groupby(['Nama Stasiun Hujan', 'Tahun'], observed=True).agg(
+        Total_Curah_Hujan=('Jumlah Curah Hujan', 'sum'),
+        Max_Curah_Hujan=('Jumlah Curah Hujan', 'max')
+    ).reset_index()
+    annual_summary['Total_Curah_Hujan'] = ch.to_mm(annual_summary['Total_Curah_Hujan'])
+    annual_summary['Max_Curah_Hujan'] = ch.to_mm(annual_summary['Max_Curah_Hujan'])
+
+    max_month_df = df_filtered.groupby(['Nama Stasiun Hujan', 'Tahun'], observed=True).apply(get_max_month).reset_index(name='Bulan_Max_Curah_Hujan')
+    annual_summary = pd.merge(annual_summary, max_month_df, on=['Nama Stasiun Hujan', 'Tahun'])
+    annual_summary['Klasifikasi_Curah_Hujan'] = annual_summary['Total_Curah_Hujan'].apply(classify_rainfall)
+
+    classification_result = annual_summary[['Nama Stasiun Hujan', 'Tahun', 'Klasifikasi_Curah_Hujan', 'Bulan_Max_Curah_Hujan', 'Total_Curah_Hujan']]
+    return classification_result.rename(columns={'Total_Curah_Hujan': 'Total Curah Hujan Tahunan (mm)'})
+
+
+def reference_max_rainfall(df):
+    max_curah_hujan = df.groupby('Nama Stasiun Hujan', observed=True)['Jumlah Curah Hujan'].max().reset_index()
+
+    info_max = []
+    for stasiun in max_curah_hujan['Nama Stasiun Hujan']:
+        data_stasiun = df[df['Nama Stasiun Hujan'] == stasiun]
+        max_value = data_stasiun['Jumlah Curah Hujan'].max()
+        max_data = data_stasiun[data_stasiun['Jumlah Curah Hujan'] == max_value].iloc[0]
+        info_max.append({
+            'Stasiun': stasiun,
+            'Curah Hujan Tertinggi': round(float(max_value), 2),
+            'Tahun': int(max_data['Tahun']),
+            'Bulan': max_data['Bulan']
+        })
+
+    df_max_info = pd.DataFrame(info_max)
+    return df_max_info.sort_values('Curah Hujan Tertinggi', ascending=False)
+
+
+def _as_plain(frame):
+    """Categorical and string columns as object, so both versions compare by value."""
+    frame = frame.reset_index(drop=True)
+    for col in frame.columns:
+        if not pd.api.types.is_numeric_dtype(frame[col]):
+            frame[col] = frame[col].astype(str).astype(object)
+    return frame
+
+
+YEARS = (2019, 2021)
+
+
+@pytest.fixture(scope='module')
+def raw():
+    """Synthetic rows with two readings per station-month, coarse values (many ties) and shuffled order."""
+    raw = generate_rainfall_data(n_stations=5, year_start=2018, year_end=2022, rows=5 * 5 * 12 * 2, seed=4)
+    raw['Jumlah Curah Hujan'] = (raw['Jumlah Curah Hujan'] // 40) * 40
+    # A second tied maximum for every station, in another year and month
+    top = raw.groupby('Nama Stasiun Hujan')['Jumlah Curah Hujan'].transform('max')
+    first_max = raw[raw['Jumlah Curah Hujan'] == top].groupby('Nama Stasiun Hujan').head(1).index
+    raw.loc[(first_max + 37) % len(raw), 'Jumlah Curah Hujan'] = raw.loc[first_max, 'Jumlah Curah Hujan'].values
+    return raw.sample(frac=1, random_state=7).reset_index(drop=True)
+
+
+@pytest.fixture(scope='module')
+def rainfall(raw):
+    return ch.prepare_rainfall_frame(raw.copy())
+
+
+def rows_results(raw, rainfall, tmp_path):
+    return {'classification': ch.analyze_classification(ch.filter_years(rainfall, *YEARS)),
+            'max_rainfall': ch.analyze_max_rainfall(rainfall)}
+
+
+def cube_results(raw, rainfall, tmp_path):
+    rain_cube = cube.RainfallCube.from_frame(rainfall)
+    return cube.analyses_from_cube(rain_cube, *YEARS, only=['classification', 'max_rainfall'])
+
+
+def streaming_results(raw, rainfall, tmp_path):
+    # Small chunks, so ties are resolved across chunk merges
+    path = tmp_path / 'rainfall.csv'
+    raw.to_csv(path, index=False)
+    results, _ = streaming.run_streaming_analyses(str(path), *YEARS, chunksize=37,
+                                                  only=['classification', 'max_rainfall'])
+    return results
+
+
+PATHS = [rows_results, cube_results, streaming_results]
+
+
+def test_rainfall_has_ties(rainfall):
+    annual_max = rainfall.groupby(['Nama Stasiun Hujan', 'Tahun'], observed=True)['Jumlah Curah Hujan'].transform('max')
+    assert (rainfall['Jumlah Curah Hujan'] == annual_max).sum() > rainfall.groupby(['Nama Stasiun Hujan', 'Tahun'], observed=True).ngroups
+
+
+@pytest.mark.parametrize('compute', PATHS, ids=['rows', 'cube', 'streaming'])
+def test_classification_matches_reference(compute, raw, rainfall, tmp_path):
+    results = compute(raw, rainfall, tmp_path)
+    pd.testing.assert_frame_equal(_as_plain(results['classification']),
+                                  _as_plain(reference_classification(ch.filter_years(rainfall, *YEARS))),
+                                  check_dtype=False)
+
+
+@pytest.mark.parametrize('compute', PATHS, ids=['rows', 'cube', 'streaming'])
+def test_max_rainfall_matches_reference(compute, raw, rainfall, tmp_path):
+    results = compute(raw, rainfall, tmp_path)
+    pd.testing.assert_frame_equal(_as_plain(results['max_rainfall']),
+                                  _as_plain(reference_max_rainfall(rainfall)), check_dtype=False)
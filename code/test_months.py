@@ -0,0 +1,59 @@
+"""
+Tests of the 'Bulan' normalisation: aliases, case and punctuation variants,
+unknown names and missing months.
+
+    python -m pytest -q test_months.py
+"""
+import numpy as np
+import pytest
+
+import curah_hujan as ch
+from benchmark import generate_rainfall_data
+
+
+@pytest.mark.parametrize('spelling, number', [
+    ('JANUARI', 1),
+    ('peb', 2),
+    ('Pebruari', 2),
+    ('MARCH', 3),
+    (' mei ', 5),
+    ('Agt.', 8),
+    ('sept.', 9),
+    ('NOPEMBER', 11),
+    ('dec', 12),
+    ('7', 7),
+    ('07', 7),
+])
+def test_month_spellings(spelling, number):
+    assert ch.month_numbers([spelling]).tolist() == [number]
+
+
+def test_month_numbers_keep_row_order():
+    values = ['MARET', 'juli', 'MARET', 'Jan', 'juli']
+    assert ch.month_numbers(values).tolist() == [3, 7, 3, 1, 7]
+
+
+def test_unknown_month_raises():
+    with pytest.raises(ValueError, match='Unknown month'):
+        ch.month_numbers(['MARET', 'BULAN 13'])
+
+
+def test_missing_month_raises():
+    # A missing value must not take the number of another spelling
+    with pytest.raises(ValueError, match='Missing month'):
+        ch.month_numbers(['MARET', None, 'JULI'])
+
+
+def test_rows_without_month_are_dropped():
+    raw = generate_rainfall_data(n_stations=2, year_start=2020, year_end=2020, missing_fraction=0)
+    raw['Bulan'] = raw['Bulan'].astype(object)
+    raw.loc[[3, 10], 'Bulan'] = np.nan
+    data = ch.prepare_rainfall_frame(raw.copy())
+
+    assert len(data) == len(raw) - 2
+    assert data['Bulan'].notna().all()
+    kept = raw.drop(index=[3, 10])
+    monthly = data.groupby('Bulan', observed=True)['Jumlah Curah Hujan'].sum()
+    expected = kept.groupby('Bulan')['Jumlah Curah Hujan'].sum()
+    for month in ch.month_order:
+        assert monthly[month] == pytest.approx(expected[month], rel=1e-6)
@@ -0,0 +1,119 @@
+"""
+Bulk writers for the result tables.
+
+A result file is described as a list of sheets, each a
+(sheet name, DataFrame, column widths) tuple; widths maps column letters
+to widths and may be empty. The same description is written as:
+
+    xlsx     one workbook per file, one worksheet per sheet. Uses xlsxwriter
+             in constant_memory mode when installed, otherwise openpyxl in
+             write-only mode. Rows are streamed to disk one at a time
+             instead of building a Python object per cell.
+    csv      one file per sheet
+    parquet  one file per sheet (needs pyarrow)
+
+Files with several sheets are written as <stem>.<sheet>.csv/.parquet, a
+single sheet as <stem>.csv/.parquet.
+"""
+import importlib.util
+import os
+import re
+
+import pandas as pd
+
+
+def _column_values(series):
+    """Column as a list of Python values, with None for missing values."""
+    values = series.tolist()
+    if series.hasnans:
+        values = [None if missing else value for value, missing in zip(values, series.isna())]
+    return values
+
+
+def iter_rows(frame):
+    """Header row followed by the data rows of frame, as lists of Python values."""
+    yield [str(col) for col in frame.columns]
+    yield from zip(*(_column_values(frame[col]) for col in frame.columns))
+
+
+def _write_xlsx_xlsxwriter(path, sheets):
+    import xlsxwriter
+    from xlsxwriter.utility import xl_cell_to_rowcol
+
+    # constant_memory flushes each row once the next one starts, so rows
+    # must be written strictly top to bottom
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        for sheet_name, frame, widths in sheets:
+            worksheet = workbook.add_worksheet(sheet_name)
+            for letter, width in widths.items():
+                col = xl_cell_to_rowcol(f'{letter}1')[1]
+                worksheet.set_column(col, col, width)
+            for row_idx, row in enumerate(iter_rows(frame)):
+                worksheet.write_row(row_idx, 0, row)
+    finally:
+        workbook.close()
+
+
+def _write_xlsx_openpyxl(path, sheets):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet_name, frame, widths in sheets:
+        worksheet = workbook.create_sheet(sheet_name)
+        # Column widths must be set before the first row is appended
+        for letter, width in widths.items():
+            worksheet.column_dimensions[letter].width = width
+        for row in iter_rows(frame):
+            worksheet.append(row)
+    workbook.save(path)
+
+
+def write_xlsx(path, sheets):
+    """Write sheets to one workbook with a streaming writer."""
+    if importlib.util.find_spec('xlsxwriter') is not None:
+        _write_xlsx_xlsxwriter(path, sheets)
+    else:
+        _write_xlsx_openpyxl(path, sheets)
+    return [path]
+
+
+def _sheet_paths(path, sheets, ext):
+    stem = os.path.splitext(path)[0]
+    if len(sheets) == 1:
+        return [stem + ext]
+    return [f"{stem}.{re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')}{ext}" for name, _, _ in sheets]
+
+
+def write_csv(path, sheets):
+    """Write each sheet to its own CSV file."""
+    paths = _sheet_paths(path, sheets, '.csv')
+    for out, (_, frame, _) in zip(paths, sheets):
+        frame.to_csv(out, index=False)
+    return paths
+
+
+def write_parquet(path, sheets):
+    """Write each sheet to its own Parquet file."""
+    paths = _sheet_paths(path, sheets, '.parquet')
+    for out, (_, frame, _) in zip(paths, sheets):
+        # Parquet needs string column names and one type per column; mixed
+        # columns (e.g. a rank column with a blank TOTAL row) become strings
+        mixed = [col for col in frame.columns
+                 if frame[col].dtype == object and pd.api.types.infer_dtype(frame[col]).startswith('mixed')]
+        frame = frame.astype({col: 'string' for col in mixed}).rename(columns=str)
+        frame.to_parquet(out, index=False)
+    return paths
+
+
+WRITERS = {'xlsx': write_xlsx, 'csv': write_csv, 'parquet': write_parquet}
+
+
+def write_table(path, sheets, fmt='xlsx'):
+    """
+    Write sheets in the given format. path is the workbook path; the other
+    formats replace its extension. Returns the written paths.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {list(WRITERS)}")
+    return WRITERS[fmt](path, sheets)